@@ -3,13 +3,21 @@ Application configuration management
 Loads settings from environment variables
 """
 
-from pydantic_settings import BaseSettings
+from functools import lru_cache
+from pydantic_settings import BaseSettings, SettingsConfigDict
 from typing import Optional
 
 
 class Settings(BaseSettings):
     """Application settings loaded from environment variables"""
     
+    model_config = SettingsConfigDict(
+        env_file=".env",
+        case_sensitive=False,
+        extra="ignore",
+        frozen=True
+    )
+    
     # Required API Keys
     gemini_api_key: str
     telegram_bot_token: str
@@ -27,6 +35,12 @@ class Settings(BaseSettings):
     max_subscribers: int = 100000
     ai_relevance_threshold: int = 85
     max_articles_per_cycle: int = 500
+    classification_batch_size: int = 10  # Articles per Gemini prompt
+    classification_concurrency: int = 4  # Gemini prompts in flight
+    pipeline_concurrency: int = 8  # Articles summarized and broadcast at once
+    broadcast_concurrency: int = 30  # Telegram sends in flight
+    broadcast_rate_limit: int = 30  # Telegram sends per second (global bot limit)
+    semantic_cache_threshold: float = 0.92  # Cosine similarity to reuse a summary
     debug_mode: bool = False
     
     # Optional WhatsApp (premium tier)
@@ -38,11 +52,9 @@ class Settings(BaseSettings):
     razorpay_key_id: Optional[str] = None
     razorpay_key_secret: Optional[str] = None
     premium_price: int = 900  # ₹9 in paise
-    
-    class Config:
-        env_file = ".env"
-        case_sensitive = False
 
 
-# Global settings instance
-settings = Settings()
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """Get the shared settings instance (loaded and validated once)"""
+    return Settings()
@@ -0,0 +1,34 @@
+"""
+Sources configuration loader
+Parses config/sources.yaml once and shares the result
+"""
+
+import yaml
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict
+
+# libYAML bindings parse several times faster; PyYAML may be built without them
+_Loader = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+
+
+@lru_cache(maxsize=4)
+def _parse_sources(path: str, mtime: float) -> Dict:
+    """Parse a sources file (cached per path and modification time)"""
+    with open(path, 'r') as f:
+        return yaml.load(f, Loader=_Loader) or {}
+
+
+def load_sources(sources_file: str = "config/sources.yaml") -> Dict:
+    """
+    Load sources configuration
+    
+    Returns the same dict for repeated calls until the file changes,
+    or an empty dict if the file doesn't exist.
+    """
+    sources_path = Path(sources_file)
+    if not sources_path.exists():
+        return {}
+    
+    resolved = sources_path.resolve()
+    return _parse_sources(str(resolved), resolved.stat().st_mtime)
@@ -0,0 +1 @@
+"""Manual trigger scripts - run from the project root with `python -m scripts.<name>`"""
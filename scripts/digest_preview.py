@@ -1,16 +1,13 @@
 
 import asyncio
 import sys
-import os
-
-# Add project root to path
-sys.path.append(os.getcwd())
 
 from src.summarization.llm_summarizer import NewsSummarizer
-from src.notification.telegram import TelegramNotifier
+from src.notification.telegram import get_notifier
 from src.storage.database import Article
+from src.logging_config import setup_logging
 
-async def test_digest():
+async def preview_digest():
     print("🧪 Testing Daily Digest Feature...")
     
     # 1. Mock some articles
@@ -46,22 +43,25 @@ async def test_digest():
     
     # 3. Send to Telegram
     print("\n📤 Sending to Telegram...")
-    telegram = TelegramNotifier()
-    await telegram.start()
+    telegram = get_notifier()
     
     # We need to manually insert these mock articles into DB for the "Read More" button to work
     # But for this test, we just want to see if the message sends.
     # The buttons won't work perfectly if IDs 1 and 2 don't exist in your local DB, 
     # but the message layout will be visible.
     
+    # The bot isn't started, so this sends through a one-shot Bot
     await telegram.send_daily_digest(digest)
-    await telegram.stop()
     print("\n✅ Test Complete!")
 
-if __name__ == "__main__":
+def main():
+    setup_logging()
     try:
         if sys.platform == 'win32':
              asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
-        asyncio.run(test_digest())
+        asyncio.run(preview_digest())
     except KeyboardInterrupt:
         pass
+
+if __name__ == "__main__":
+    main()
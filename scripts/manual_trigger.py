@@ -1,12 +1,9 @@
 
 import asyncio
 import sys
-import os
-
-# Add project root to path
-sys.path.append(os.getcwd())
 
 from src.scheduler.tasks import NewsAgentScheduler
+from src.logging_config import setup_logging
 
 async def trigger_manual_updates():
     print("🚀 Manually triggering AI News Pipeline and Daily Digest...")
@@ -21,15 +18,14 @@ async def trigger_manual_updates():
     print("\nStep 2: Running Daily Digest...")
     await agent.run_daily_digest()
     
-    # Clean up Telegram connection if necessary (though run_daily_digest uses its own bot instance)
-    # Actually TelegramNotifier creates its own application. 
-    # Let's ensure everything is closed.
-    if hasattr(agent.telegram, 'stop'):
-        await agent.telegram.stop()
-        
+    # The bot application is never started here, so there is nothing to stop
     print("\n✅ Manual trigger complete!")
 
-if __name__ == "__main__":
+def main():
+    setup_logging()
     if sys.platform == 'win32':
         asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
     asyncio.run(trigger_manual_updates())
+
+if __name__ == "__main__":
+    main()
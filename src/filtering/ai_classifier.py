@@ -4,29 +4,86 @@ Uses Google Gemini to determine if news is AI-related
 """
 
 import google.generativeai as genai
-import json
-import yaml
-from pathlib import Path
-from typing import Dict, Tuple
-from config.settings import settings
+import ahocorasick
+import asyncio
+import logging
+import orjson
+from typing import Dict, List, Optional, Tuple
+from config.settings import get_settings
+from config.sources import load_sources
+from src.gemini_client import get_model
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+
+_CRITERIA = """
+Focus on:
+- AI models and research
+- Machine learning breakthroughs
+- AI products and releases
+- AI policy and regulation
+- AI hardware
+
+NOT relevant if it's only:
+- General tech news
+- Business news mentioning AI in passing
+- Generic productivity tools using AI as a buzzword
+"""
 
 
 class AIRelevanceFilter:
     """Filter articles for AI relevance using Gemini"""
     
+    # Shared by every request; JSON mode makes Gemini return bare JSON
+    _GEN_CFG = genai.types.GenerationConfig(
+        temperature=0.2,  # Low temperature for factual classification
+        response_mime_type='application/json'
+    )
+    
+    _PROMPT_TMPL = """
+Classify if this news article is primarily about AI/ML technology.
+
+Title: {title}
+Summary: {summary}
+
+Respond ONLY with valid JSON in this exact format:
+{{
+    "relevant": true/false,
+    "confidence": 0-100,
+    "reasoning": "brief explanation"
+}}
+""" + _CRITERIA
+    
+    _BATCH_ARTICLE_TMPL = "Article {id}:\nTitle: {title}\nSummary: {summary}\n\n"
+    
+    _BATCH_PROMPT_TMPL = """
+Classify if each of these news articles is primarily about AI/ML technology.
+
+{articles}
+Respond ONLY with a valid JSON array containing one object per article, in this exact format:
+[
+    {{
+        "id": 1,
+        "relevant": true/false,
+        "confidence": 0-100,
+        "reasoning": "brief explanation"
+    }}
+]
+""" + _CRITERIA
+    
     def __init__(self):
         """Initialize Gemini model"""
-        genai.configure(api_key=settings.gemini_api_key)
-        self.model = genai.GenerativeModel('gemini-1.5-flash')
+        self.model = get_model()
         
         # Load keywords from sources config
-        sources_path = Path("config/sources.yaml")
-        if sources_path.exists():
-            with open(sources_path, 'r') as f:
-                sources = yaml.safe_load(f)
-                self.keywords = sources.get('ai_keywords', {})
+        sources = load_sources()
+        if sources:
+            self.keywords = sources.get('ai_keywords', {})
         else:
             self.keywords = self._default_keywords()
+        
+        self._automaton = self._build_automaton(self.keywords)
     
     def _default_keywords(self) -> Dict:
         """Default AI keywords if config not found"""
@@ -39,70 +96,76 @@ class AIRelevanceFilter:
             'topics': ['AI model', 'AI research', 'computer vision', 'NLP']
         }
     
-    def _keyword_prefilter(self, article: Dict) -> bool:
-        """Fast keyword-based pre-filter"""
-        text = f"{article.get('title', '')} {article.get('summary', '')}".lower()
+    @staticmethod
+    def _build_automaton(keywords: Dict):
+        """Build an Aho-Corasick automaton over all keyword categories"""
+        automaton = ahocorasick.Automaton()
+        for category in ('primary', 'companies', 'topics'):
+            for keyword in keywords.get(category) or []:
+                automaton.add_word(keyword.lower(), category)
+        
+        if len(automaton) == 0:
+            return None
+        
+        automaton.make_automaton()
+        return automaton
+    
+    def _count_keyword_hits(self, article: Dict) -> Dict[str, int]:
+        """Count keyword hits per category (single pass over the text)"""
+        hits = {'primary': 0, 'companies': 0, 'topics': 0}
+        if self._automaton is None:
+            return hits
         
-        # Check primary keywords
-        for keyword in self.keywords.get('primary', []):
-            if keyword.lower() in text:
-                return True
+        # Lowercase once and keep it on the article for later stages
+        text = article.get('_search_text')
+        if text is None:
+            text = f"{article.get('title', '')} {article.get('summary', '')}".lower()
+            article['_search_text'] = text
         
-        # Check company names
-        for company in self.keywords.get('companies', []):
-            if company.lower() in text:
-                return True
+        for _, category in self._automaton.iter(text):
+            hits[category] += 1
+        
+        return hits
+    
+    def _keyword_prefilter(self, article: Dict) -> Optional[Tuple[bool, float, str]]:
+        """
+        Fast keyword-based pre-filter
+        
+        Rejects articles without AI keywords and accepts articles dense
+        with them, so Gemini only sees the gray zone.
+        
+        Returns:
+            (is_relevant, confidence, reasoning), or None if Gemini should decide
+        """
+        hits = self._count_keyword_hits(article)
+        strong_hits = hits['primary'] + hits['companies']
+        score = 2 * hits['primary'] + 3 * hits['companies'] + hits['topics']
         
-        # Check topics
-        for topic in self.keywords.get('topics', []):
-            if topic.lower() in text:
-                return True
+        if score == 0:
+            return False, 0.0, "No AI keywords found"
+        if score >= 8 and strong_hits >= 2:
+            return True, 90.0, "High keyword density"
         
-        return False
+        return None
     
-    def classify_with_gemini(self, article: Dict) -> Tuple[bool, float, str]:
+    def classify_with_gemini(self, article: Dict) -> Optional[Tuple[bool, float, str]]:
         """
         Classify article using Gemini AI
         
         Returns:
-            (is_relevant, confidence, reasoning)
+            (is_relevant, confidence, reasoning), or None if Gemini failed
+            and the article should be classified again later
         """
-        prompt = f"""
-Classify if this news article is primarily about AI/ML technology.
-
-Title: {article.get('title', '')}
-Summary: {article.get('summary', '')[:500]}
-
-Respond ONLY with valid JSON in this exact format:
-{{
-    "relevant": true/false,
-    "confidence": 0-100,
-    "reasoning": "brief explanation"
-}}
-
-Focus on:
-- AI models and research
-- Machine learning breakthroughs
-- AI products and releases
-- AI policy and regulation
-- AI hardware
-
-NOT relevant if it's only:
-- General tech news
-- Business news mentioning AI in passing
-- Generic productivity tools using AI as a buzzword
-"""
+        prompt = self._PROMPT_TMPL.format(
+            title=article.get('title', ''),
+            summary=article.get('summary', '')[:500]
+        )
         
         try:
-            response = self.model.generate_content(
-                prompt,
-                generation_config=genai.types.GenerationConfig(
-                    temperature=0.2,  # Low temperature for factual classification
-                )
-            )
+            response = self.model.generate_content(prompt, generation_config=self._GEN_CFG)
             
             # Parse JSON response
-            result = json.loads(response.text.strip())
+            result = orjson.loads(response.text)
             
             is_relevant = result.get('relevant', False)
             confidence = float(result.get('confidence', 0))
@@ -110,35 +173,142 @@ NOT relevant if it's only:
             
             return is_relevant, confidence, reasoning
             
-        except json.JSONDecodeError as e:
-            print(f"⚠️ Failed to parse Gemini response as JSON: {e}")
-            print(f"Response: {response.text}")
-            return False, 0.0, "JSON parse error"
+        except orjson.JSONDecodeError as e:
+            logger.warning("⚠️ Failed to parse Gemini response as JSON: %s\nResponse: %s", e, response.text)
+            return None
         except Exception as e:
-            print(f"❌ Gemini classification error: {e}")
-            return False, 0.0, f"Error: {str(e)}"
+            logger.warning("❌ Gemini classification error: %s", e)
+            return None
     
-    def is_ai_relevant(self, article: Dict) -> Tuple[bool, float, str]:
+    async def classify_batch(self, articles: List[Dict]) -> List[Optional[Tuple[bool, float, str]]]:
         """
-        Determine if article is AI-relevant
+        Classify many articles with batched, concurrent Gemini calls
+        
+        Articles are grouped into prompts of `classification_batch_size`
+        and at most `classification_concurrency` prompts are in flight.
         
         Returns:
-            (is_relevant, confidence, reasoning)
+            List of (is_relevant, confidence, reasoning), in input order;
+            None for articles Gemini failed to classify
         """
-        # Stage 1: Fast keyword pre-filter
-        if not self._keyword_prefilter(article):
-            return False, 0.0, "No AI keywords found"
+        batch_size = settings.classification_batch_size
         
-        # Stage 2: Gemini AI classification
-        is_relevant, confidence, reasoning = self.classify_with_gemini(article)
+        # A single prompt needs no semaphore or gather
+        if len(articles) <= batch_size:
+            return await self._classify_chunk(articles) if articles else []
+        
+        semaphore = asyncio.Semaphore(settings.classification_concurrency)
+        
+        async def run(chunk: List[Dict]) -> List[Optional[Tuple[bool, float, str]]]:
+            async with semaphore:
+                return await self._classify_chunk(chunk)
+        
+        chunks = [articles[i:i + batch_size] for i in range(0, len(articles), batch_size)]
+        results = await asyncio.gather(*(run(chunk) for chunk in chunks))
+        
+        return [verdict for chunk_verdicts in results for verdict in chunk_verdicts]
+    
+    async def _classify_chunk(self, articles: List[Dict]) -> List[Optional[Tuple[bool, float, str]]]:
+        """Classify one batch of articles with a single Gemini call (None where it failed)"""
+        articles_text = "".join(
+            self._BATCH_ARTICLE_TMPL.format(
+                id=i,
+                title=article.get('title', ''),
+                summary=article.get('summary', '')[:500]
+            )
+            for i, article in enumerate(articles, 1)
+        )
+        prompt = self._BATCH_PROMPT_TMPL.format(articles=articles_text)
+        
+        try:
+            response = await self.model.generate_content_async(prompt, generation_config=self._GEN_CFG)
+            
+            # Parse JSON response
+            results = {int(item.get('id', 0)): item for item in orjson.loads(response.text)}
+            
+            verdicts = []
+            for i in range(1, len(articles) + 1):
+                result = results.get(i)
+                if result is None:
+                    verdicts.append(None)  # Missing from the response; retried later
+                    continue
+                verdicts.append((
+                    bool(result.get('relevant', False)),
+                    float(result.get('confidence', 0)),
+                    result.get('reasoning', '')
+                ))
+            
+            return verdicts
+            
+        except orjson.JSONDecodeError as e:
+            logger.warning("⚠️ Failed to parse Gemini batch response as JSON: %s\nResponse: %s", e, response.text)
+            return [None] * len(articles)
+        except Exception as e:
+            logger.warning("❌ Gemini batch classification error: %s", e)
+            return [None] * len(articles)
+    
+    def _apply_threshold(self, article: Dict, verdict: Tuple[bool, float, str]) -> Tuple[bool, float, str]:
+        """Only accept a Gemini verdict if confidence is above threshold"""
+        is_relevant, confidence, reasoning = verdict
         
-        # Only accept if confidence is above threshold
         if is_relevant and confidence >= settings.ai_relevance_threshold:
-            print(f"✅ AI-relevant ({confidence}%): {article['title'][:60]}...")
+            logger.debug("✅ AI-relevant (%s%%): %.60s...", confidence, article['title'])
             return True, confidence, reasoning
         else:
-            print(f"❌ Not AI-relevant ({confidence}%): {article['title'][:60]}...")
+            logger.debug("❌ Not AI-relevant (%s%%): %.60s...", confidence, article['title'])
             return False, confidence, reasoning
+    
+    def is_ai_relevant(self, article: Dict) -> Optional[Tuple[bool, float, str]]:
+        """
+        Determine if article is AI-relevant
+        
+        Returns:
+            (is_relevant, confidence, reasoning), or None if Gemini failed
+        """
+        # Stage 1: Fast keyword pre-filter
+        verdict = self._keyword_prefilter(article)
+        if verdict is not None:
+            is_relevant = verdict[0]
+            return self._apply_threshold(article, verdict) if is_relevant else verdict
+        
+        # Stage 2: Gemini AI classification
+        verdict = self.classify_with_gemini(article)
+        return self._apply_threshold(article, verdict) if verdict is not None else None
+    
+    async def is_ai_relevant_batch(self, articles: List[Dict]) -> List[Optional[Tuple[bool, float, str]]]:
+        """
+        Determine AI relevance for many articles at once
+        
+        Runs the keyword pre-filter on every article, then sends only the
+        gray-zone candidates to Gemini via classify_batch.
+        
+        Returns:
+            List of (is_relevant, confidence, reasoning), in input order;
+            None for articles Gemini failed to classify
+        """
+        verdicts = [None] * len(articles)
+        
+        # Stage 1: Fast keyword pre-filter
+        candidates = []
+        for i, article in enumerate(articles):
+            verdict = self._keyword_prefilter(article)
+            if verdict is None:
+                candidates.append(i)
+            elif verdict[0]:
+                verdicts[i] = self._apply_threshold(article, verdict)
+            else:
+                verdicts[i] = verdict
+        
+        if not candidates:
+            return verdicts
+        
+        # Stage 2: Batched Gemini AI classification
+        results = await self.classify_batch([articles[i] for i in candidates])
+        for i, verdict in zip(candidates, results):
+            if verdict is not None:
+                verdicts[i] = self._apply_threshold(articles[i], verdict)
+        
+        return verdicts
 
 
 if __name__ == "__main__":
@@ -158,9 +328,9 @@ if __name__ == "__main__":
     }
     
     print("\n=== Test Article 1 (Should be relevant) ===")
-    relevant, conf, reason = filter.is_ai_relevant(test_article_1)
+    relevant, conf, reason = filter.is_ai_relevant(test_article_1) or (False, 0.0, "Gemini failed")
     print(f"Relevant: {relevant}, Confidence: {conf}%, Reasoning: {reason}\n")
     
     print("=== Test Article 2 (Should NOT be relevant) ===")
-    relevant, conf, reason = filter.is_ai_relevant(test_article_2)
+    relevant, conf, reason = filter.is_ai_relevant(test_article_2) or (False, 0.0, "Gemini failed")
     print(f"Relevant: {relevant}, Confidence: {conf}%, Reasoning: {reason}")
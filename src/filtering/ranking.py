@@ -0,0 +1,23 @@
+"""
+Article Ranking
+Scores classified articles for the daily digest
+"""
+
+import heapq
+from typing import List
+from src.storage.database import Article
+
+
+def combined_score(article: Article) -> float:
+    """Blend AI confidence and source credibility (both 0-100)"""
+    return 0.6 * (article.ai_confidence or 0.0) + 0.4 * (article.credibility_score or 0.0)
+
+
+def top_articles(articles: List[Article], n: int = 10) -> List[Article]:
+    """
+    Pick the n best-scoring articles
+    
+    Ties keep their input order, so newer articles win when the
+    input is sorted by publish date.
+    """
+    return heapq.nlargest(n, articles, key=combined_score)
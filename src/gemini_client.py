@@ -0,0 +1,15 @@
+"""
+Shared Gemini client
+Configures the API once and reuses one model per process
+"""
+
+import google.generativeai as genai
+from functools import lru_cache
+from config.settings import get_settings
+
+
+@lru_cache(maxsize=None)
+def get_model(model_name: str = 'gemini-1.5-flash') -> genai.GenerativeModel:
+    """Get the shared Gemini model (configured on first use)"""
+    genai.configure(api_key=get_settings().gemini_api_key)
+    return genai.GenerativeModel(model_name)
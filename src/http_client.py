@@ -0,0 +1,38 @@
+"""
+Shared HTTP client
+One aiohttp connection pool per process, reused across fetch cycles
+"""
+
+import asyncio
+import aiohttp
+from typing import Optional
+
+_connector: Optional[aiohttp.TCPConnector] = None
+_connector_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def _get_connector() -> aiohttp.TCPConnector:
+    """Get the shared connector, creating it for the running event loop"""
+    global _connector, _connector_loop
+    
+    # Connectors are bound to the loop they were created on
+    loop = asyncio.get_running_loop()
+    if _connector is None or _connector.closed or _connector_loop is not loop:
+        _connector = aiohttp.TCPConnector(limit=64, limit_per_host=4, ttl_dns_cache=300)
+        _connector_loop = loop
+    
+    return _connector
+
+
+def get_session() -> aiohttp.ClientSession:
+    """New session on the shared pool (closing it leaves the pool open)"""
+    return aiohttp.ClientSession(connector=_get_connector(), connector_owner=False)
+
+
+async def close_session_pool():
+    """Close the shared connection pool"""
+    global _connector, _connector_loop
+    if _connector is not None and not _connector.closed:
+        await _connector.close()
+    _connector = None
+    _connector_loop = None
@@ -14,73 +14,281 @@ except ImportError:
     except ImportError:
         pass
 
+import asyncio
+import calendar
+import hashlib
+import io
+import os
+import pickle
+import time
+import aiohttp
 import feedparser
-import yaml
+import xml.etree.ElementTree as ET
 
-from datetime import datetime, timedelta
-from typing import List, Dict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from email.utils import parsedate_tz, mktime_tz
+from typing import List, Dict, Optional, Tuple
 from pathlib import Path
+from urllib.parse import urlparse
+from config.sources import load_sources
+from src.http_client import get_session
+
+
+# Feeds only yield the last 48 hours, so hashes not seen for longer are dropped
+SEEN_URLS_RETENTION = 72 * 3600
+
+# Only articles from the last 48 hours are kept
+MAX_ARTICLE_AGE = 48 * 3600
+
+# Fully qualified tags the fast parser understands; anything else (media:,
+# itunes:, ...) is ignored rather than mistaken for a core field
+_ATOM = '{http://www.w3.org/2005/Atom}'
+_RSS1 = '{http://purl.org/rss/1.0/}'
+_CONTENT = '{http://purl.org/rss/1.0/modules/content/}'
+_DC = '{http://purl.org/dc/elements/1.1/}'
+
+_FEED_ROOTS = {'rss', '{http://www.w3.org/1999/02/22-rdf-syntax-ns#}RDF', _ATOM + 'feed'}
+_ITEM_TAGS = {'item', _RSS1 + 'item', _ATOM + 'entry'}
+_TITLE_TAGS = {'title', _RSS1 + 'title', _ATOM + 'title'}
+_LINK_TAGS = {'link', _RSS1 + 'link'}
+_SUMMARY_TAGS = {'description', _RSS1 + 'description', _ATOM + 'summary'}
+_CONTENT_TAGS = {_CONTENT + 'encoded', _ATOM + 'content'}
+_PUBLISHED_TAGS = {'pubDate', _ATOM + 'published', _DC + 'date'}
 
 
 class RSSFetcher:
     """Fetches news from RSS feeds"""
     
-    def __init__(self, sources_file: str = "config/sources.yaml"):
+    def __init__(self, sources_file: str = "config/sources.yaml", state_file: str = ".cache/rss_state.pkl"):
         """Initialize with sources configuration"""
         self.sources = self._load_sources(sources_file)
         
+        # Fetch state persisted across restarts
+        self._state_file = Path(state_file)
+        state = self._load_state()
+        # 64-bit URL hash -> last time seen
+        self._seen: Dict[int, float] = state.get('seen', {})
+        # RSS URL -> (ETag, Last-Modified) from the last successful fetch
+        self._etag_cache: Dict[str, Tuple[Optional[str], Optional[str]]] = state.get('etags', {})
+        # Validators from this cycle's fetches, held back until their
+        # articles have been processed (see commit_validators)
+        self._pending_validators: Dict[str, Tuple[Optional[str], Optional[str]]] = {}
+        # Dedicated pool so feed parsing doesn't block the event loop
+        # or starve the default executor
+        self._parse_executor = ThreadPoolExecutor(max_workers=os.cpu_count())
+        
     def _load_sources(self, sources_file: str) -> Dict:
         """Load sources from YAML file"""
-        sources_path = Path(sources_file)
-        if not sources_path.exists():
+        sources = load_sources(sources_file)
+        if not sources:
             print(f"⚠️ Sources file not found: {sources_file}")
             return {}
-            
-        with open(sources_path, 'r') as f:
-            return yaml.safe_load(f)
+        
+        # Domain only depends on the source URL, so compute it once per source
+        for group in ('official_sources', 'media_outlets'):
+            for source_config in (sources.get(group) or {}).values():
+                if '_domain' not in source_config:
+                    source_config['_domain'] = self._extract_domain(source_config['url'])
+        
+        return sources
     
     def fetch_from_source(self, source_name: str, source_config: Dict) -> List[Dict]:
         """Fetch articles from a single RSS source"""
-        articles = []
+        if 'rss' not in source_config:
+            return []
+            
+        rss_url = source_config['rss']
+        etag, modified = self._etag_cache.get(rss_url, (None, None))
         
+        try:
+            feed = feedparser.parse(rss_url, etag=etag, modified=modified)
+            
+            # Feed unchanged since the last fetch
+            if feed.get('status') == 304:
+                print(f"⏭️ No changes from {source_name}")
+                return []
+            
+            if feed.get('etag') or feed.get('modified'):
+                self._pending_validators[rss_url] = (feed.get('etag'), feed.get('modified'))
+            
+            return self._parse_entries(feed.entries, source_name, source_config)
+        except Exception as e:
+            print(f"❌ Error fetching from {source_name}: {e}")
+            return []
+    
+    async def _fetch_feed(self, session: aiohttp.ClientSession, source_id: str, source_config: Dict) -> List[Dict]:
+        """Download a single RSS feed asynchronously and parse it"""
         if 'rss' not in source_config:
-            return articles
+            return []
             
+        rss_url = source_config['rss']
+        headers = {}
+        etag, modified = self._etag_cache.get(rss_url, (None, None))
+        if etag:
+            headers['If-None-Match'] = etag
+        if modified:
+            headers['If-Modified-Since'] = modified
+        
         try:
-            feed = feedparser.parse(source_config['rss'])
-            
-            for entry in feed.entries:
-                # Parse published date
-                published_at = None
-                if hasattr(entry, 'published_parsed') and entry.published_parsed:
-                    published_at = datetime(*entry.published_parsed[:6])
-                elif hasattr(entry, 'updated_parsed') and entry.updated_parsed:
-                    published_at = datetime(*entry.updated_parsed[:6])
-                else:
-                    published_at = datetime.utcnow()
+            async with session.get(rss_url, headers=headers, timeout=aiohttp.ClientTimeout(total=15)) as response:
+                # Feed unchanged since the last fetch
+                if response.status == 304:
+                    print(f"⏭️ No changes from {source_id}")
+                    return []
                 
-                # Only get recent articles (last 48 hours)
-                if published_at < datetime.utcnow() - timedelta(hours=48):
-                    continue
+                body = await response.read()
                 
-                article = {
-                    'title': entry.get('title', ''),
-                    'url': entry.get('link', ''),
-                    'summary': entry.get('summary', entry.get('description', '')),
-                    'published_at': published_at,
-                    'source_name': source_config['name'],
-                    'source_url': source_config['url'],
-                    'source_domain': self._extract_domain(source_config['url']),
-                    'credibility': source_config.get('credibility', 80)
-                }
-                
-                articles.append(article)
-                
-            print(f"✅ Fetched {len(articles)} articles from {source_name}")
+                if response.status == 200:
+                    etag = response.headers.get('ETag')
+                    modified = response.headers.get('Last-Modified')
+                    if etag or modified:
+                        self._pending_validators[rss_url] = (etag, modified)
             
+            loop = asyncio.get_running_loop()
+            cutoff_ts = int(time.time()) - MAX_ARTICLE_AGE
+            entries = await loop.run_in_executor(self._parse_executor, self._parse_feed, body, cutoff_ts)
+            return self._parse_entries(entries, source_id, source_config)
         except Exception as e:
-            print(f"❌ Error fetching from {source_name}: {e}")
+            print(f"❌ Error fetching from {source_id}: {e}")
+            return []
+    
+    @classmethod
+    def _parse_feed(cls, body: bytes, cutoff_ts: int) -> List[Dict]:
+        """Parse a downloaded feed, falling back to feedparser for anything unusual"""
+        try:
+            entries = cls._fast_parse(body, cutoff_ts)
+            if entries is not None:
+                return entries
+        except ET.ParseError:
+            pass
+        
+        return feedparser.parse(body).entries
+    
+    @staticmethod
+    def _fast_parse(body: bytes, cutoff_ts: int) -> Optional[List[Dict]]:
+        """
+        Stream RSS/Atom items without building the whole document
+        
+        Skips items older than the cutoff; feeds aren't guaranteed to list
+        newest items first.
+        
+        Returns:
+            Entries shaped like feedparser's, or None if the document is not
+            an RSS or Atom feed or has an item without a link
+        """
+        entries = []
+        root_checked = False
+        
+        for event, elem in ET.iterparse(io.BytesIO(body), events=('start', 'end')):
+            if event == 'start':
+                if not root_checked:
+                    if elem.tag not in _FEED_ROOTS:
+                        return None
+                    root_checked = True
+                continue
+            
+            if elem.tag not in _ITEM_TAGS:
+                continue
+            
+            entry = {}
+            guid = None
+            for child in elem:
+                tag = child.tag
+                if tag in _LINK_TAGS:
+                    entry.setdefault('link', (child.text or '').strip())
+                elif tag == _ATOM + 'link':
+                    # Atom links carry the URL in href; prefer the alternate link
+                    if child.get('rel', 'alternate') == 'alternate' and child.get('href'):
+                        entry.setdefault('link', child.get('href'))
+                elif tag == 'guid':
+                    # A guid is the item's URL unless it says otherwise
+                    if child.get('isPermaLink', 'true') == 'true':
+                        guid = (child.text or '').strip()
+                elif tag in _TITLE_TAGS:
+                    entry['title'] = ''.join(child.itertext()).strip()
+                elif tag in _SUMMARY_TAGS:
+                    entry['summary'] = ''.join(child.itertext()).strip()
+                elif tag in _CONTENT_TAGS:
+                    entry.setdefault('summary', ''.join(child.itertext()).strip())
+                elif tag in _PUBLISHED_TAGS:
+                    entry.setdefault('published_parsed', RSSFetcher._parse_date(child.text))
+                elif tag == _ATOM + 'updated':
+                    entry['updated_parsed'] = RSSFetcher._parse_date(child.text)
+            
+            # Release the item's children as we go
+            elem.clear()
+            
+            if not entry.get('link') and guid:
+                entry['link'] = guid
+            if not entry.get('link'):
+                return None  # Let feedparser work out what this feed means
+            
+            published = entry.get('published_parsed') or entry.get('updated_parsed')
+            if published and calendar.timegm(published) < cutoff_ts:
+                continue
+            
+            entries.append(entry)
+        
+        return entries
+    
+    @staticmethod
+    def _parse_date(value: Optional[str]) -> Optional[time.struct_time]:
+        """Parse an RFC 822 or ISO 8601 feed date into a UTC struct_time"""
+        if not value:
+            return None
+        
+        value = value.strip()
+        try:
+            parsed = parsedate_tz(value)
+            if parsed:
+                return time.gmtime(mktime_tz(parsed))
+            
+            dt = datetime.fromisoformat(value.replace('Z', '+00:00'))
+            if dt.tzinfo is None:
+                return dt.timetuple()
+            return time.gmtime(dt.timestamp())
+        except (ValueError, OverflowError):
+            return None
+    
+    def _parse_entries(self, entries: List, source_name: str, source_config: Dict) -> List[Dict]:
+        """Convert parsed feed entries into article dicts"""
+        articles = []
+        
+        # Read the clock once per feed; entries are compared as epoch seconds
+        now = datetime.now(timezone.utc)
+        cutoff_ts = now.timestamp() - MAX_ARTICLE_AGE
+        
+        for entry in entries:
+            # Parse published date
+            published = entry.get('published_parsed') or entry.get('updated_parsed')
+            if published:
+                # Only get recent articles (last 48 hours)
+                if calendar.timegm(published) < cutoff_ts:
+                    continue
+                published_at = datetime(*published[:6], tzinfo=timezone.utc)
+            else:
+                published_at = now
+            
+            title = entry.get('title', '')
+            summary = entry.get('summary', entry.get('description', ''))
+            
+            article = {
+                'title': title,
+                'url': entry.get('link', ''),
+                'summary': summary,
+                'published_at': published_at,
+                'source_name': source_config['name'],
+                'source_url': source_config['url'],
+                'source_domain': source_config['_domain'],
+                'credibility': source_config.get('credibility', 80),
+                # Lowercased once here so the keyword pre-filter can reuse it
+                '_search_text': f"{title} {summary}".lower()
+            }
+            
+            articles.append(article)
             
+        print(f"✅ Fetched {len(articles)} articles from {source_name}")
         return articles
     
     def fetch_all_official_sources(self) -> List[Dict]:
@@ -107,32 +315,156 @@ class RSSFetcher:
         print(f"📰 Total articles from media outlets: {len(all_articles)}")
         return all_articles
     
-    def fetch_all(self) -> List[Dict]:
-        """Fetch from all sources"""
+    def _all_sources(self) -> Dict:
+        """Official sources and media outlets, keyed by source id"""
+        return {
+            **(self.sources.get('official_sources') or {}),
+            **(self.sources.get('media_outlets') or {})
+        }
+    
+    async def fetch_all_async(self) -> List[Dict]:
+        """Fetch from all sources concurrently"""
+        sources = self._all_sources()
+        
+        async with get_session() as session:
+            tasks = [
+                self._fetch_feed(session, source_id, source_config)
+                for source_id, source_config in sources.items()
+            ]
+            results = await asyncio.gather(*tasks, return_exceptions=True)
+        
         all_articles = []
+        for source_id, result in zip(sources, results):
+            if isinstance(result, Exception):
+                print(f"❌ Error fetching from {source_id}: {result}")
+                continue
+            all_articles.extend(result)
         
-        # Fetch from official sources
-        all_articles.extend(self.fetch_all_official_sources())
+        return self._dedupe(all_articles)
+    
+    async def stream_all(self, queue: asyncio.Queue, limit: Optional[int] = None) -> int:
+        """
+        Fetch from all sources concurrently, putting each new article on
+        the queue as soon as its feed has been parsed
         
-        # Fetch from media outlets
-        all_articles.extend(self.fetch_all_media_outlets())
+        Args:
+            queue: Queue that receives unique, previously unseen articles
+            limit: Maximum number of articles to queue
+            
+        Returns:
+            Number of articles queued
+        """
+        now = time.time()
+        seen_urls = set()
+        queued = 0
+        self._pending_validators = {}
+        
+        async def produce(session: aiohttp.ClientSession, source_id: str, source_config: Dict):
+            nonlocal queued
+            for article in await self._fetch_feed(session, source_id, source_config):
+                if limit is not None and queued >= limit:
+                    # The rest of this feed is picked up next cycle, which
+                    # needs a full response rather than a 304
+                    self._pending_validators.pop(source_config['rss'], None)
+                    return
+                if self._is_new(article, seen_urls, now):
+                    queued += 1
+                    await queue.put(article)
+        
+        async with get_session() as session:
+            await asyncio.gather(*(
+                produce(session, source_id, source_config)
+                for source_id, source_config in self._all_sources().items()
+            ))
         
-        # Remove duplicates by URL
+        print(f"📊 Total unique articles: {queued}")
+        return queued
+    
+    def fetch_all(self) -> List[Dict]:
+        """Fetch from all sources (blocking wrapper around fetch_all_async)"""
+        sources = self._all_sources()
+        
+        # A single feed gains nothing from an event loop and HTTP session
+        if len(sources) == 1:
+            source_id, source_config = next(iter(sources.items()))
+            return self._dedupe(self.fetch_from_source(source_id, source_config))
+        
+        return asyncio.run(self.fetch_all_async())
+    
+    def _dedupe(self, all_articles: List[Dict]) -> List[Dict]:
+        """Remove duplicates by URL, including articles seen in earlier cycles"""
+        now = time.time()
         seen_urls = set()
-        unique_articles = []
-        for article in all_articles:
-            if article['url'] not in seen_urls:
-                seen_urls.add(article['url'])
-                unique_articles.append(article)
+        unique_articles = [
+            article for article in all_articles
+            if self._is_new(article, seen_urls, now)
+        ]
         
-        print(f"📊 Total unique articles: {len(unique_articles)} (removed {len(all_articles) - len(unique_articles)} duplicates)")
+        removed = len(all_articles) - len(unique_articles)
+        print(f"📊 Total unique articles: {len(unique_articles)} (removed {removed} duplicates or articles seen in earlier cycles)")
         
         return unique_articles
     
+    def _is_new(self, article: Dict, seen_urls: set, now: float) -> bool:
+        """Check an article against this cycle's URLs and earlier cycles' hashes"""
+        if article['url'] in seen_urls:
+            return False
+        seen_urls.add(article['url'])
+        
+        url_hash = self._url_hash(article['url'])
+        if url_hash in self._seen:
+            self._seen[url_hash] = now
+            return False
+        
+        return True
+    
+    @staticmethod
+    def _url_hash(url: str) -> int:
+        """Compact 64-bit hash of an article URL"""
+        return int.from_bytes(hashlib.blake2b(url.encode(), digest_size=8).digest(), 'little')
+    
+    def _load_state(self) -> Dict:
+        """Load seen URL hashes and feed validators from disk"""
+        if not self._state_file.exists():
+            return {}
+        
+        try:
+            with open(self._state_file, 'rb') as f:
+                return pickle.load(f)
+        except Exception as e:
+            print(f"⚠️ Could not load fetcher state from {self._state_file}: {e}")
+            return {}
+    
+    def commit_validators(self):
+        """Keep this cycle's ETag/Last-Modified values once its articles are processed"""
+        self._etag_cache.update(self._pending_validators)
+        self._pending_validators = {}
+    
+    def discard_validators(self):
+        """Forget this cycle's validators so the next cycle refetches those feeds in full"""
+        self._pending_validators = {}
+    
+    def mark_seen(self, articles: List[Dict]):
+        """Remember articles so later cycles skip them without a DB lookup"""
+        now = time.time()
+        for article in articles:
+            self._seen[self._url_hash(article['url'])] = now
+    
+    def save_state(self):
+        """Drop expired hashes and persist fetcher state to disk"""
+        cutoff = time.time() - SEEN_URLS_RETENTION
+        self._seen = {url_hash: ts for url_hash, ts in self._seen.items() if ts >= cutoff}
+        
+        try:
+            self._state_file.parent.mkdir(parents=True, exist_ok=True)
+            with open(self._state_file, 'wb') as f:
+                pickle.dump({'seen': self._seen, 'etags': self._etag_cache}, f)
+        except Exception as e:
+            print(f"⚠️ Could not save fetcher state to {self._state_file}: {e}")
+    
     @staticmethod
     def _extract_domain(url: str) -> str:
         """Extract domain from URL"""
-        from urllib.parse import urlparse
         parsed = urlparse(url)
         return parsed.netloc
 
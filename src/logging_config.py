@@ -0,0 +1,35 @@
+"""
+Logging setup
+Hands log records to a background thread so hot paths never block on stdout
+"""
+
+import atexit
+import logging
+import queue
+from logging.handlers import QueueHandler, QueueListener
+from typing import Optional
+
+_listener: Optional[QueueListener] = None
+
+
+def setup_logging(level: int = logging.INFO, fmt: str = "%(message)s") -> QueueListener:
+    """
+    Route the root logger through a queue drained by a stream handler
+    
+    Safe to call more than once; later calls only return the running listener.
+    """
+    global _listener
+    if _listener is not None:
+        return _listener
+    
+    # Records are formatted by the QueueHandler, so the stream writes them as-is
+    log_queue = queue.SimpleQueue()
+    stream_handler = logging.StreamHandler()
+    
+    logging.basicConfig(level=level, format=fmt, handlers=[QueueHandler(log_queue)], force=True)
+    
+    _listener = QueueListener(log_queue, stream_handler, respect_handler_level=True)
+    _listener.start()
+    # Flush whatever is still queued when the process exits
+    atexit.register(_listener.stop)
+    return _listener
@@ -14,9 +14,11 @@ import logging
 from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from src.scheduler.tasks import NewsAgentScheduler
+from src.http_client import close_session_pool
+from src.logging_config import setup_logging
 
 # Configure logging
-logging.basicConfig(level=logging.INFO)
+setup_logging(fmt=logging.BASIC_FORMAT)
 logger = logging.getLogger(__name__)
 
 # Global agent instance
@@ -34,16 +36,18 @@ async def lifespan(app: FastAPI):
         await agent.start()
         yield
     except Exception as e:
-        logger.error(f"❌ Error during startup: {e}")
+        logger.error("❌ Error during startup: %s", e)
         yield
     finally:
         logger.info("🛑 Shutting down AI News Agent...")
         try:
+            agent.rss_fetcher.save_state()
+            await close_session_pool()
             await agent.telegram.stop()
             if agent.scheduler.running:
                 agent.scheduler.shutdown()
         except Exception as e:
-            logger.error(f"❌ Error during shutdown: {e}")
+            logger.error("❌ Error during shutdown: %s", e)
 
 # Create FastAPI app
 app = FastAPI(
@@ -67,4 +71,5 @@ async def health_check():
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run("src.main:app", host="0.0.0.0", port=8000, reload=True)
+    # "auto" picks uvloop where it is installed (not on Windows)
+    uvicorn.run("src.main:app", host="0.0.0.0", port=8000, reload=True, loop="auto", http="httptools")
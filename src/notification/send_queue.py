@@ -0,0 +1,75 @@
+"""
+Telegram send gate
+Shared limits for every outgoing message, with a global pause on flood control
+"""
+
+from aiolimiter import AsyncLimiter
+from datetime import timedelta
+from telegram.error import RetryAfter
+from typing import Any, Awaitable, Callable
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class TelegramSendQueue:
+    """
+    Gate that every Telegram send passes through
+    
+    Bounds sends in flight and per second. When Telegram answers 429, all
+    senders stop until its retry_after has passed, instead of each one
+    hammering the API and collecting its own rejection.
+    """
+    
+    def __init__(self, concurrency: int, rate_limit: int, max_retries: int = 3):
+        """
+        Args:
+            concurrency: Sends in flight at once
+            rate_limit: Sends started per second
+            max_retries: Attempts after a 429 before the send is given up
+        """
+        self.max_retries = max_retries
+        
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self._rate_limiter = AsyncLimiter(rate_limit, 1)
+        
+        # Cleared while Telegram's flood control is in effect
+        self._ok_to_send = asyncio.Event()
+        self._ok_to_send.set()
+    
+    async def acquire(self):
+        """Wait for a free send slot"""
+        await self._semaphore.acquire()
+    
+    def release(self):
+        """Give back a send slot taken with acquire()"""
+        self._semaphore.release()
+    
+    async def send(self, send: Callable[[], Awaitable[Any]]) -> Any:
+        """Run send() once the gate is open, retrying after flood control"""
+        for attempt in range(self.max_retries + 1):
+            await self._ok_to_send.wait()
+            try:
+                async with self._rate_limiter:
+                    return await send()
+            except RetryAfter as e:
+                if attempt == self.max_retries:
+                    raise
+                await self._pause(e.retry_after)
+    
+    async def _pause(self, retry_after):
+        """Hold every sender for retry_after (seconds or a timedelta)"""
+        # Sends already in flight may also get 429; only the first one sleeps
+        if not self._ok_to_send.is_set():
+            await self._ok_to_send.wait()
+            return
+        
+        delay = retry_after.total_seconds() if isinstance(retry_after, timedelta) else retry_after
+        logger.warning("⏸️ Telegram flood control, pausing all sends for %ss", delay)
+        
+        self._ok_to_send.clear()
+        try:
+            await asyncio.sleep(delay)
+        finally:
+            self._ok_to_send.set()
@@ -3,15 +3,81 @@ Telegram Bot Integration
 Handles user subscriptions and news delivery
 """
 
-from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
+from telegram import Bot, Update, InlineKeyboardButton, InlineKeyboardMarkup
 from telegram.ext import Application, CommandHandler, CallbackQueryHandler, ContextTypes
-from telegram.constants import ParseMode, ChatAction
-from sqlalchemy.orm import Session
-from src.storage.database import SessionLocal, Subscriber, Article
-from datetime import datetime
-from config.settings import settings
-from typing import List, Dict
+from telegram.constants import ParseMode
+from telegram.error import RetryAfter
+from telegram.request import HTTPXRequest
+from sqlalchemy import func, select
+from src.storage.database import AsyncSessionLocal, Subscriber, Article, upsert_subscriber
+from src.notification.send_queue import TelegramSendQueue
+from config.settings import get_settings
+from functools import lru_cache
+from typing import Awaitable, Callable, List, Dict, Optional, Tuple
+from cachetools import TTLCache
 import asyncio
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+# Cached active chat IDs are reloaded after this many seconds, in case
+# subscriptions change outside this process
+SUBSCRIBER_CACHE_TTL = 300
+
+# Read More messages are kept for the lifetime of a daily digest
+ARTICLE_CACHE_TTL = 86400
+
+# Publication time shown in news alerts
+_PUBLISHED_FORMAT = '%b %d, %Y - %I:%M %p UTC'
+
+# Fixed bot replies
+_ALREADY_SUBSCRIBED = (
+    "✅ You're already subscribed to AI News updates!\n\n"
+    "Use /stop to unsubscribe.\n"
+    "Use /help for more options."
+)
+
+_WELCOME_BACK = (
+    "🎉 Welcome back! Your subscription has been reactivated.\n\n"
+    "You'll now receive verified AI news updates."
+)
+
+_WELCOME_NEW = (
+    "🤖 *Welcome to AI News Alert Bot!*\n\n"
+    "You'll receive instant notifications for verified AI news:\n\n"
+    "✅ Highly relevant AI news\n"
+    "✅ Daily Digests (New!)\n"
+    "✅ 100% Free & Ad-free\n\n"
+    "Use /help to see all commands."
+)
+
+_UNSUBSCRIBED = (
+    "👋 You've been unsubscribed from AI News updates.\n\n"
+    "To resubscribe, just send /start anytime.\n\n"
+    "We're sad to see you go!"
+)
+
+_NOT_SUBSCRIBED = (
+    "You're not currently subscribed.\n\n"
+    "Send /start to subscribe to AI news updates!"
+)
+
+_HELP_TEXT = (
+    "🤖 *AI News Alert Bot - Help*\n\n"
+    "*Commands:*\n"
+    "/start - Subscribe to AI news updates\n"
+    "/stop - Unsubscribe from updates\n"
+    "/status - Check your subscription status\n"
+    "/help - Show this help message\n\n"
+    "*About:*\n"
+    "This bot delivers verified AI news from trusted sources.\n\n"
+    "*Features:*\n"
+    "• Instant alerts for major AI news\n"
+    "• Daily Digest of top stories (New!)\n"
+    "• Click 'Read More' for details\n"
+)
 
 
 class TelegramNotifier:
@@ -20,7 +86,25 @@ class TelegramNotifier:
     def __init__(self):
         """Initialize Telegram bot"""
         self.token = settings.telegram_bot_token
-        self.application = Application.builder().token(self.token).build()
+        # One pooled connection per in-flight send; polling gets its own small pool
+        self.application = (
+            Application.builder()
+            .token(self.token)
+            .connection_pool_size(settings.broadcast_concurrency)
+            .pool_timeout(20)
+            .connect_timeout(10)
+            .read_timeout(20)
+            .get_updates_connection_pool_size(4)
+            .build()
+        )
+        self._active_chat_ids: Optional[set] = None
+        self._chat_ids_loaded_at = 0.0
+        
+        # Shared by every send path so concurrent broadcasts stay under Telegram's limits
+        self._send_queue = TelegramSendQueue(settings.broadcast_concurrency, settings.broadcast_rate_limit)
+        
+        # Article ID -> formatted detail message for Read More taps
+        self._article_cache = TTLCache(maxsize=512, ttl=ARTICLE_CACHE_TTL)
         self._setup_handlers()
     
     def _setup_handlers(self):
@@ -33,131 +117,143 @@ class TelegramNotifier:
         # Callback handler for inline buttons (Read More)
         self.application.add_handler(CallbackQueryHandler(self.button_handler))
     
+    async def _get_active_chat_ids(self) -> List[str]:
+        """Get active subscriber chat IDs, cached between broadcasts"""
+        expired = time.monotonic() - self._chat_ids_loaded_at > SUBSCRIBER_CACHE_TTL
+        if self._active_chat_ids is None or expired:
+            async with AsyncSessionLocal() as db:
+                result = await db.execute(
+                    select(Subscriber.chat_id).where(Subscriber.is_active.is_(True))
+                )
+                chat_ids = result.scalars().all()
+            
+            self._active_chat_ids = set(chat_ids)
+            self._chat_ids_loaded_at = time.monotonic()
+        
+        return list(self._active_chat_ids)
+    
+    async def _fan_out(self, chat_ids: List[str], send: Callable[[str], Awaitable]) -> int:
+        """
+        Run send(chat_id) for every chat within the concurrency and rate limits
+        
+        A task is only created once a send slot frees up, so pending work
+        grows with the concurrency limit rather than the subscriber count.
+        A failed send is logged and never cancels the others; a 429 pauses
+        every send until Telegram's retry_after has passed.
+        
+        Returns:
+            Number of successful sends (send returned anything but False)
+        """
+        success_count = 0
+        
+        async def run(chat_id: str):
+            nonlocal success_count
+            try:
+                result = await self._send_queue.send(lambda: send(chat_id))
+                if result is not False:
+                    success_count += 1
+            except Exception as e:
+                logger.warning("❌ Send failed: %s", e)
+            finally:
+                self._send_queue.release()
+        
+        async with asyncio.TaskGroup() as group:
+            for chat_id in chat_ids:
+                await self._send_queue.acquire()
+                group.create_task(run(chat_id))
+        
+        return success_count
+    
+    def _set_subscribed(self, chat_id: str, active: bool):
+        """Keep the cached chat IDs in sync with a subscription change"""
+        if self._active_chat_ids is None:
+            return
+        if active:
+            self._active_chat_ids.add(chat_id)
+        else:
+            self._active_chat_ids.discard(chat_id)
+    
     async def start_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle /start command - subscribe user"""
         chat_id = str(update.effective_chat.id)
         user = update.effective_user
         
-        # Add subscriber to database
-        db = SessionLocal()
         try:
-            # Check if already subscribed
-            existing = db.query(Subscriber).filter(Subscriber.chat_id == chat_id).first()
-            
-            if existing:
-                if existing.is_active:
-                    await update.message.reply_text (
-                        "✅ You're already subscribed to AI News updates!\n\n"
-                        "Use /stop to unsubscribe.\n"
-                        "Use /help for more options."
-                    )
-                else:
-                    # Reactivate subscription
-                    existing.is_active = True
-                    existing.subscribed_at = datetime.utcnow()
-                    existing.unsubscribed_at = None
-                    db.commit()
-                    
-                    await update.message.reply_text(
-                        "🎉 Welcome back! Your subscription has been reactivated.\n\n"
-                        "You'll now receive verified AI news updates."
-                    )
-            else:
-                # New subscriber
-                subscriber = Subscriber(
-                    chat_id=chat_id,
+            # Insert, reactivate, or leave an active subscription as is
+            async with AsyncSessionLocal() as db:
+                result = await upsert_subscriber(
+                    db,
+                    chat_id,
                     username=user.username,
                     first_name=user.first_name,
                     last_name=user.last_name
                 )
-                db.add(subscriber)
-                db.commit()
+            
+            if result is None:
+                await update.message.reply_text(_ALREADY_SUBSCRIBED)
+            elif result == "reactivated":
+                self._set_subscribed(chat_id, True)
                 
-                # Welcome message
-                welcome_message = (
-                    "🤖 *Welcome to AI News Alert Bot!*\n\n"
-                    "You'll receive instant notifications for verified AI news:\n\n"
-                    "✅ Highly relevant AI news\n"
-                    "✅ Daily Digests (New!)\n"
-                    "✅ 100% Free & Ad-free\n\n"
-                    "Use /help to see all commands."
-                )
+                await update.message.reply_text(_WELCOME_BACK)
+            else:
+                self._set_subscribed(chat_id, True)
                 
-                await update.message.reply_text(
-                    welcome_message,
-                    parse_mode=ParseMode.MARKDOWN
-                )
+                # Welcome message
+                await update.message.reply_text(_WELCOME_NEW, parse_mode=ParseMode.MARKDOWN)
                 
-                print(f"✅ New subscriber: {user.username or user.first_name} ({chat_id})")
+                logger.info("✅ New subscriber: %s (%s)", user.username or user.first_name, chat_id)
                 
         except Exception as e:
-            print(f"❌ Error in start_command: {e}")
+            logger.error("❌ Error in start_command: %s", e)
             await update.message.reply_text(
                 "⚠️ Sorry, there was an error processing your subscription. Please try again."
             )
-        finally:
-            db.close()
     
     async def stop_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle /stop command - unsubscribe user"""
         chat_id = str(update.effective_chat.id)
         
-        db = SessionLocal()
         try:
-            subscriber = db.query(Subscriber).filter(Subscriber.chat_id == chat_id).first()
+            async with AsyncSessionLocal() as db:
+                result = await db.execute(select(Subscriber).where(Subscriber.chat_id == chat_id))
+                subscriber = result.scalar_one_or_none()
+                
+                unsubscribed = subscriber is not None and subscriber.is_active
+                if unsubscribed:
+                    subscriber.is_active = False
+                    subscriber.unsubscribed_at = func.now()
+                    await db.commit()
             
-            if subscriber and subscriber.is_active:
-                subscriber.is_active = False
-                subscriber.unsubscribed_at = datetime.utcnow()
-                db.commit()
+            if unsubscribed:
+                self._set_subscribed(chat_id, False)
                 
-                await update.message.reply_text(
-                    "👋 You've been unsubscribed from AI News updates.\n\n"
-                    "To resubscribe, just send /start anytime.\n\n"
-                    "We're sad to see you go!"
-                )
+                await update.message.reply_text(_UNSUBSCRIBED)
                 
-                print(f"❌ Unsubscribed: {chat_id}")
+                logger.info("❌ Unsubscribed: %s", chat_id)
             else:
-                await update.message.reply_text(
-                    "You're not currently subscribed.\n\n"
-                    "Send /start to subscribe to AI news updates!"
-                )
+                await update.message.reply_text(_NOT_SUBSCRIBED)
                 
         except Exception as e:
-            print(f"❌ Error in stop_command: {e}")
+            logger.error("❌ Error in stop_command: %s", e)
             await update.message.reply_text(
                 "⚠️ Sorry, there was an error processing your request. Please try again."
             )
-        finally:
-            db.close()
     
     async def help_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle /help command"""
-        help_text = (
-            "🤖 *AI News Alert Bot - Help*\n\n"
-            "*Commands:*\n"
-            "/start - Subscribe to AI news updates\n"
-            "/stop - Unsubscribe from updates\n"
-            "/status - Check your subscription status\n"
-            "/help - Show this help message\n\n"
-            "*About:*\n"
-            "This bot delivers verified AI news from trusted sources.\n\n"
-            "*Features:*\n"
-            "• Instant alerts for major AI news\n"
-            "• Daily Digest of top stories (New!)\n"
-            "• Click 'Read More' for details\n"
-        )
-        
-        await update.message.reply_text(help_text, parse_mode=ParseMode.MARKDOWN)
+        await update.message.reply_text(_HELP_TEXT, parse_mode=ParseMode.MARKDOWN)
     
     async def status_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle /status command"""
         chat_id = str(update.effective_chat.id)
         
-        db = SessionLocal()
         try:
-            subscriber = db.query(Subscriber).filter(Subscriber.chat_id == chat_id).first()
+            # Only the two columns shown are needed
+            async with AsyncSessionLocal() as db:
+                result = await db.execute(
+                    select(Subscriber.is_active, Subscriber.subscribed_at).where(Subscriber.chat_id == chat_id)
+                )
+                subscriber = result.first()
             
             if subscriber and subscriber.is_active:
                 status_text = (
@@ -176,10 +272,8 @@ class TelegramNotifier:
             await update.message.reply_text(status_text, parse_mode=ParseMode.MARKDOWN)
             
         except Exception as e:
-            print(f"❌ Error in status_command: {e}")
+            logger.error("❌ Error in status_command: %s", e)
             await update.message.reply_text("⚠️ Error checking status. Please try again.")
-        finally:
-            db.close()
     
     async def button_handler(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle button clicks"""
@@ -192,21 +286,34 @@ class TelegramNotifier:
             article_id = int(data.split("_")[1])
             await self.send_article_detail(query.message.chat_id, article_id)
     
+    @staticmethod
+    def _format_article_detail(article: Article) -> str:
+        """Build the Read More message for an article"""
+        return (
+            f"📰 *{article.title}*\n\n"
+            f"{article.summary}\n\n"
+            f"*Source:* {article.source_name}\n"
+            f"[{article.source_domain}]({article.url})"
+        )
+    
     async def send_article_detail(self, chat_id: int, article_id: int):
         """Send full details for a requested article"""
-        db = SessionLocal()
         try:
-            article = db.query(Article).filter(Article.id == article_id).first()
-            if not article:
+            # Digest articles are cached when the digest goes out
+            message = self._article_cache.get(article_id)
+            
+            if message is None:
+                # Build the message and release the connection before any network I/O
+                async with AsyncSessionLocal() as db:
+                    article = await db.get(Article, article_id)
+                
+                if article:
+                    message = self._format_article_detail(article)
+                    self._article_cache[article_id] = message
+            
+            if not message:
                 await self.application.bot.send_message(chat_id, "⚠️ Article not found.")
                 return
-
-            message = (
-                f"📰 *{article.title}*\n\n"
-                f"{article.summary}\n\n"
-                f"*Source:* {article.source_name}\n"
-                f"[{article.source_domain}]({article.url})"
-            )
             
             await self.application.bot.send_message(
                 chat_id=chat_id,
@@ -216,11 +323,31 @@ class TelegramNotifier:
             )
             
         except Exception as e:
-            print(f"❌ Error sending detail: {e}")
-        finally:
-            db.close()
+            logger.error("❌ Error sending detail: %s", e)
 
-    async def send_daily_digest(self, digest: Dict, article_map: Dict[int, int] = None) -> int:
+    def format_daily_digest(self, digest: Dict) -> Tuple[str, InlineKeyboardMarkup]:
+        """Build the digest message text and its Read More buttons"""
+        message = f"☕ *Daily AI News Digest*\n\n{digest.get('intro', '')}\n\n"
+        
+        keyboard = []
+        
+        for item in digest.get('items', []):
+            # Add item text
+            message += f"🔹 *{item.get('headline')}*\n{item.get('impact')}\n\n"
+            
+            # Add button
+            # We use a short callback data: read_{id}
+            # Ensure id exists
+            if 'id' in item:
+                keyboard.append([InlineKeyboardButton(
+                    f"Read: {item.get('headline')[:20]}...", 
+                    callback_data=f"read_{item['id']}"
+                )])
+        
+        message += f"{digest.get('outro', '')}"
+        return message, InlineKeyboardMarkup(keyboard)
+    
+    async def send_daily_digest(self, digest: Dict, article_map: Dict[int, int] = None, articles: List[Article] = None) -> int:
         """
         Send daily digest to all subscribers
         
@@ -228,94 +355,115 @@ class TelegramNotifier:
             digest: JSON object with intro, items, outro
             article_map: Mapping of digest item index (if needed) to DB article ID
                          Actually, let's assume digest['items'] contains 'id' matching DB id.
+            articles: Articles the digest was built from; their Read More
+                      messages are cached so button taps skip the database
                          
         Returns:
             Number of successful sends
         """
-        db = SessionLocal()
+        for article in articles or []:
+            self._article_cache[article.id] = self._format_article_detail(article)
+        
         try:
-            subscribers = db.query(Subscriber).filter(Subscriber.is_active == True).all()
+            chat_ids = await self._get_active_chat_ids()
             
-            if not subscribers:
+            if not chat_ids:
                 return 0
             
-            # Construct message
-            message = f"☕ *Daily AI News Digest*\n\n{digest.get('intro', '')}\n\n"
+            message, reply_markup = self.format_daily_digest(digest)
             
-            keyboard = []
+            logger.info("📤 Sending Daily Digest to %d subscribers...", len(chat_ids))
             
-            for item in digest.get('items', []):
-                # Add item text
-                message += f"🔹 *{item.get('headline')}*\n{item.get('impact')}\n\n"
-                
-                # Add button
-                # We use a short callback data: read_{id}
-                # Ensure id exists
-                if 'id' in item:
-                    keyboard.append([InlineKeyboardButton(
-                        f"Read: {item.get('headline')[:20]}...", 
-                        callback_data=f"read_{item['id']}"
-                    )])
-            
-            message += f"{digest.get('outro', '')}"
-            reply_markup = InlineKeyboardMarkup(keyboard)
+            # One-shot scripts never start the application; skip its lifecycle
+            if not self.application.running:
+                success_count = await self.send_once(message, chat_ids, reply_markup=reply_markup)
+                logger.info("✅ Digest sent to %d/%d subscribers", success_count, len(chat_ids))
+                return success_count
             
-            print(f"📤 Sending Daily Digest to {len(subscribers)} subscribers...")
+            markup_kwargs = self._markup_api_kwargs(reply_markup)
             
-            tasks = []
-            for sub in subscribers:
-                tasks.append(
-                    self.application.bot.send_message(
-                        chat_id=sub.chat_id,
-                        text=message,
-                        parse_mode=ParseMode.MARKDOWN,
-                        reply_markup=reply_markup
-                    )
+            success_count = await self._fan_out(
+                chat_ids,
+                lambda chat_id: self.application.bot.send_message(
+                    chat_id=chat_id,
+                    text=message,
+                    parse_mode=ParseMode.MARKDOWN,
+                    api_kwargs=markup_kwargs
                 )
+            )
             
-            results = await asyncio.gather(*tasks, return_exceptions=True)
-            
-            success_count = 0
-            for res in results:
-                if not isinstance(res, Exception):
-                    success_count += 1
-                else:
-                    print(f"❌ Send failed: {res}")
-            
-            print(f"✅ Digest sent to {success_count}/{len(subscribers)} subscribers")
+            logger.info("✅ Digest sent to %d/%d subscribers", success_count, len(chat_ids))
             return success_count
             
         except Exception as e:
-            print(f"❌ Error sending daily digest: {e}")
+            logger.error("❌ Error sending daily digest: %s", e)
             return 0
-        finally:
-            db.close()
 
-    async def send_news_notification(self, chat_id: str, article: dict, summary: dict) -> bool:
+    async def send_once(self, text: str, chat_ids: List[str], reply_markup: Optional[InlineKeyboardMarkup] = None) -> int:
         """
-        Send news notification to a single subscriber
+        Send a message without starting the bot application
+        
+        Uses a bare Bot for single-shot sends (scripts, cron jobs), so no
+        updater or background tasks are started.
         
-        Args:
-            chat_id: Telegram chat ID
-            article: Article data
-            summary: Gemini-generated summary
-            
         Returns:
-            Success status
+            Number of successful sends
         """
-        try:
-            # Format message
-            message = (
-                f"🤖 *AI News Alert*\n\n"
-                f"{summary.get('headline', article['title'])}\n\n"
-                f"*Why it matters:*\n"
-                f"{summary.get('why_matters', 'Significant development in AI.')}\n\n"
-                f"*Source:*\n{article['source_name']}\n\n"
-                f"⏰ {article['published_at'].strftime('%b %d, %Y - %I:%M %p UTC')}\n\n"
-                f"[Read More]({article['url']})"
+        request = HTTPXRequest(
+            connection_pool_size=settings.broadcast_concurrency,
+            pool_timeout=20,
+            connect_timeout=10,
+            read_timeout=20
+        )
+        markup_kwargs = self._markup_api_kwargs(reply_markup)
+        
+        async with Bot(self.token, request=request) as bot:
+            return await self._fan_out(
+                chat_ids,
+                lambda chat_id: bot.send_message(
+                    chat_id=chat_id,
+                    text=text,
+                    parse_mode=ParseMode.MARKDOWN,
+                    api_kwargs=markup_kwargs
+                )
             )
-            
-            # Send message
+
+    @staticmethod
+    def _markup_api_kwargs(reply_markup: Optional[InlineKeyboardMarkup]) -> Dict:
+        """
+        Serialize a keyboard once for a whole fan-out
+        
+        The JSON string goes out as-is through api_kwargs instead of being
+        re-serialized by every send_message call.
+        """
+        if reply_markup is None:
+            return {}
+        return {'reply_markup': reply_markup.to_json()}
+    
+    def _format_news_message(self, article: dict, summary: dict) -> str:
+        """
+        Build the news alert text (identical for every subscriber)
+        
+        Called once per broadcast; per-subscriber personalization should
+        reuse these values rather than reformat the whole message.
+        """
+        headline = summary.get('headline') or article['title']
+        why_matters = summary.get('why_matters', 'Significant development in AI.')
+        published = article['published_at'].strftime(_PUBLISHED_FORMAT)
+        
+        return (
+            f"🤖 *AI News Alert*\n\n"
+            f"{headline}\n\n"
+            f"*Why it matters:*\n"
+            f"{why_matters}\n\n"
+            f"*Source:*\n{article['source_name']}\n\n"
+            f"⏰ {published}\n\n"
+            f"[Read More]({article['url']})"
+        )
+    
+    async def _send_message(self, chat_id: str, message: str) -> bool:
+        """Send an already formatted news alert to a single subscriber"""
+        try:
             await self.application.bot.send_message(
                 chat_id=chat_id,
                 text=message,
@@ -325,57 +473,78 @@ class TelegramNotifier:
             
             return True
             
+        except RetryAfter:
+            raise  # Flood control is handled by the send queue
+        except Exception as e:
+            logger.warning("❌ Failed to send notification to %s: %s", chat_id, e)
+            return False
+    
+    async def send_news_notification(self, chat_id: str, article: dict, summary: dict) -> bool:
+        """
+        Send news notification to a single subscriber
+        
+        Args:
+            chat_id: Telegram chat ID
+            article: Article data
+            summary: Gemini-generated summary
+            
+        Returns:
+            Success status
+        """
+        try:
+            message = self._format_news_message(article, summary)
         except Exception as e:
-            print(f"❌ Failed to send notification to {chat_id}: {e}")
+            logger.error("❌ Failed to format notification for %s: %s", chat_id, e)
             return False
+        
+        return await self._send_message(chat_id, message)
     
-    async def broadcast_news(self, article: dict, summary: dict) -> int:
+    async def broadcast_news(self, article: dict, summary: dict) -> Optional[int]:
         """
         Broadcast news to all active subscribers
         
         Returns:
-            Number of successful sends
+            Number of successful sends, or None if nobody is subscribed
         """
-        db = SessionLocal()
         try:
             # Get all active subscribers
-            subscribers = db.query(Subscriber).filter(Subscriber.is_active == True).all()
+            chat_ids = await self._get_active_chat_ids()
             
-            print(f"📤 Broadcasting to {len(subscribers)} subscribers...")
+            if not chat_ids:
+                logger.info("📭 No active subscribers, nothing to send")
+                return None
             
-            # Send to all subscribers
-            tasks = []
-            for subscriber in subscribers:
-                task = self.send_news_notification(subscriber.chat_id, article, summary)
-                tasks.append(task)
+            logger.info("📤 Broadcasting to %d subscribers...", len(chat_ids))
             
-            # Execute all sends concurrently
-            results = await asyncio.gather(*tasks)
+            # Format once; every subscriber gets the same text
+            message = self._format_news_message(article, summary)
             
-            success_count = sum(results)
-            print(f"✅ Successfully sent to {success_count}/{len(subscribers)} subscribers")
+            # Send to all subscribers; one failure must not cancel the rest
+            success_count = await self._fan_out(
+                chat_ids,
+                lambda chat_id: self._send_message(chat_id, message)
+            )
+            logger.info("✅ Successfully sent to %d/%d subscribers", success_count, len(chat_ids))
             
             return success_count
             
         except Exception as e:
-            print(f"❌ Error in broadcast_news: {e}")
+            logger.error("❌ Error in broadcast_news: %s", e)
             return 0
-        finally:
-            db.close()
     
     async def start(self):
         """Start the bot"""
-        print("🤖 Starting Telegram bot polling...")
+        logger.info("🤖 Starting Telegram bot polling...")
         await self.application.initialize()
         await self.application.start()
         # Ensure no webhook is active (conflict with polling)
         await self.application.bot.delete_webhook()
         await self.application.updater.start_polling()
-        print("✅ Telegram bot polling started")
+        logger.info("✅ Telegram bot polling started")
     
     async def stop(self):
         """Stop the bot"""
-        print("🤖 Stopping Telegram bot...")
+        logger.info("🤖 Stopping Telegram bot...")
         if self.application.updater:
             await self.application.updater.stop()
         if self.application:
@@ -383,7 +552,13 @@ class TelegramNotifier:
             await self.application.shutdown()
 
 
+@lru_cache(maxsize=1)
+def get_notifier() -> TelegramNotifier:
+    """Get the shared notifier (one Application and HTTP pool per process)"""
+    return TelegramNotifier()
+
+
 if __name__ == "__main__":
     # Test the bot
-    bot = TelegramNotifier()
-    bot.run()
+    bot = get_notifier()
+    bot.application.run_polling()
@@ -15,18 +15,30 @@ except ImportError:
         pass
 
 import asyncio
+import logging
 import time
-from datetime import datetime
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy import select, update
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from apscheduler.triggers.interval import IntervalTrigger
 from apscheduler.triggers.cron import CronTrigger
 
 from src.ingestion.rss_fetcher import RSSFetcher
 from src.filtering.ai_classifier import AIRelevanceFilter
-from src.summarization.llm_summarizer import NewsSummarizer
-from src.notification.telegram import TelegramNotifier
-from src.storage.database import SessionLocal, Article, init_db, get_recent_articles
-from config.settings import settings
+from src.filtering.ranking import top_articles
+from src.summarization.llm_summarizer import BatchedNewsSummarizer
+from src.notification.telegram import get_notifier
+from src.http_client import close_session_pool
+from src.logging_config import setup_logging
+from src.storage.database import SessionLocal, AsyncSessionLocal, Article, init_db, get_recent_articles, insert_new_articles
+from config.settings import get_settings
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+# Cycles an article's broadcast is retried before it is given up on
+MAX_SEND_ATTEMPTS = 3
 
 
 class NewsAgentScheduler:
@@ -34,7 +46,7 @@ class NewsAgentScheduler:
     
     def __init__(self):
         """Initialize all components"""
-        print("🚀 Initializing AI News Agent...")
+        logger.info("🚀 Initializing AI News Agent...")
         
         # Initialize database
         init_db()
@@ -42,121 +54,347 @@ class NewsAgentScheduler:
         # Initialize components
         self.rss_fetcher = RSSFetcher()
         self.ai_filter = AIRelevanceFilter()
-        self.summarizer = NewsSummarizer()
-        self.telegram = TelegramNotifier()
+        self.summarizer = BatchedNewsSummarizer()
+        self.telegram = get_notifier()
+        
+        # Failed broadcast attempts per article ID, for MAX_SEND_ATTEMPTS
+        self._send_attempts: Dict[int, int] = {}
         
         # Scheduler
         self.scheduler = AsyncIOScheduler()
         
-        print("✅ All components initialized")
+        logger.info("✅ All components initialized")
+    
+    async def _filter_unprocessed(self, articles: List[Dict]) -> Tuple[List[Dict], List[Tuple[int, Dict, Optional[Dict]]]]:
+        """
+        Split articles by what the database already has for them
+        
+        Returns:
+            (articles not stored yet, (article_id, article_data, summary) for
+            stored relevant articles that were never sent; summary is None
+            if summarizing them failed too)
+        """
+        async with AsyncSessionLocal() as db:
+            # One IN query for the whole batch instead of a lookup per URL
+            urls = [article_data['url'] for article_data in articles]
+            result = await db.execute(
+                select(Article.id, Article.url, Article.is_ai_relevant, Article.summary, Article.notification_sent)
+                .where(Article.url.in_(urls))
+            )
+            stored = {row.url: row for row in result}
+        
+        new_articles = [article_data for article_data in articles if article_data['url'] not in stored]
+        
+        # A summary or broadcast that failed or never ran left these behind;
+        # a stored summary is reused instead of asking Gemini again
+        unsent = []
+        for article_data in articles:
+            row = stored.get(article_data['url'])
+            if row is not None and row.is_ai_relevant and not row.notification_sent:
+                summary = self._stored_summary(row.summary) if row.summary else None
+                unsent.append((row.id, article_data, summary))
+        
+        return new_articles, unsent
+    
+    @staticmethod
+    def _stored_summary(text: str) -> Dict:
+        """Split a stored summary column back into its headline and why_matters"""
+        headline, _, why_matters = text.partition("\n\n")
+        return {'headline': headline, 'why_matters': why_matters or 'Significant development in AI.'}
+    
+    async def _fetch_and_classify(self) -> Tuple[List[Tuple[Dict, Tuple[bool, float, str]]], List[Tuple[int, Dict, Optional[Dict]]]]:
+        """
+        Stream fetched articles into batched classification
+        
+        Feeds push articles onto a bounded queue as they are parsed, while
+        consumers flush batches to the AI filter once they are full or have
+        waited long enough, so Gemini works while slow feeds are still loading.
+        
+        Returns:
+            (article_data, verdict) pairs for articles not processed before,
+            and (article_id, article_data, summary) for stored articles that
+            still need to be sent
+        """
+        batch_size = settings.classification_batch_size
+        workers = settings.classification_concurrency
+        queue: asyncio.Queue = asyncio.Queue(maxsize=64)
+        classified = []
+        unsent = []
+        
+        async def produce() -> int:
+            try:
+                return await self.rss_fetcher.stream_all(queue, limit=settings.max_articles_per_cycle)
+            finally:
+                # One sentinel per consumer signals the end of the stream
+                for _ in range(workers):
+                    await queue.put(None)
+        
+        async def classify(batch: List[Dict]):
+            try:
+                # Skip articles processed in previous cycles
+                new_articles, batch_unsent = await self._filter_unprocessed(batch)
+                pending_urls = {article_data['url'] for article_data in new_articles}
+                pending_urls.update(article_data['url'] for _, article_data, _ in batch_unsent)
+                self.rss_fetcher.mark_seen([a for a in batch if a['url'] not in pending_urls])
+                unsent.extend(batch_unsent)
+                
+                if new_articles:
+                    verdicts = await self.ai_filter.is_ai_relevant_batch(new_articles)
+                    classified.extend(
+                        (article_data, verdict)
+                        for article_data, verdict in zip(new_articles, verdicts)
+                        if verdict is not None
+                    )
+                    # Articles Gemini failed on stay unstored and unseen; their
+                    # feeds must not answer 304 next cycle
+                    if None in verdicts:
+                        logger.warning("⚠️ %d articles could not be classified, retrying next cycle", verdicts.count(None))
+                        self.rss_fetcher.discard_validators()
+            except Exception as e:
+                # Keep draining the queue; these articles are retried next cycle,
+                # so the feeds they came from must not answer 304
+                logger.error("❌ Error classifying batch: %s", e)
+                self.rss_fetcher.discard_validators()
+        
+        async def consume():
+            loop = asyncio.get_running_loop()
+            finished = False
+            while not finished:
+                article_data = await queue.get()
+                if article_data is None:
+                    return
+                
+                # Fill the batch until it is full or the window closes
+                batch = [article_data]
+                deadline = loop.time() + 0.5
+                while len(batch) < batch_size:
+                    try:
+                        article_data = await asyncio.wait_for(queue.get(), deadline - loop.time())
+                    except asyncio.TimeoutError:
+                        break
+                    if article_data is None:
+                        finished = True
+                        break
+                    batch.append(article_data)
+                
+                await classify(batch)
+        
+        fetched, *_ = await asyncio.gather(produce(), *(consume() for _ in range(workers)))
+        logger.info("📊 Fetched %d articles, %d not processed before", fetched, len(classified))
+        
+        return classified, unsent
     
-    async def process_single_article(self, article_data: dict) -> bool:
+    def _article_row(self, article_data: Dict, verdict: Tuple[bool, float, str]) -> Dict:
+        """Column values for storing a classified article"""
+        is_relevant, confidence, reasoning = verdict
+        return {
+            'title': article_data['title'],
+            'url': article_data['url'],
+            'source_name': article_data['source_name'],
+            'source_domain': article_data['source_domain'],
+            'published_at': article_data['published_at'],
+            'content': article_data.get('summary', ''),
+            'is_ai_relevant': is_relevant,
+            'ai_confidence': confidence,
+            'credibility_score': article_data.get('credibility', 80),
+            'is_verified': True if article_data.get('credibility', 0) >= settings.verification_threshold else False,
+            'verification_reason': reasoning
+        }
+    
+    async def _store_articles(self, classified: List[Tuple[Dict, Tuple[bool, float, str]]]) -> Dict[str, int]:
         """
-        Process a single article through the pipeline
+        Store a cycle's classified articles with one INSERT statement
+        
+        Returns:
+            {url: id} of the articles that were newly inserted
+        """
+        try:
+            async with AsyncSessionLocal() as db:
+                return await insert_new_articles(
+                    db,
+                    [self._article_row(article_data, verdict) for article_data, verdict in classified]
+                )
+        except Exception as e:
+            logger.exception("❌ Error storing articles: %s", e)
+            return {}
+    
+    async def process_single_article(self, article_id: int, article_data: dict, verdict: Tuple[bool, float, str]) -> bool:
+        """
+        Process a single stored article through the pipeline
+        
+        The summary is stored before broadcasting, so a failed broadcast can
+        be retried from it next cycle. No write lock is held across network I/O.
+        
+        Args:
+            article_id: ID of the article row stored by run_news_pipeline
+            article_data: Article data
+            verdict: (is_relevant, confidence, reasoning) from the AI filter
         
         Returns:
             True if article was sent, False otherwise
         """
-        db = SessionLocal()
         try:
-            # Check if already processed
-            existing = db.query(Article).filter(Article.url == article_data['url']).first()
-            if existing:
-                return False  # Already processed
-            
-            # Step 1: Check AI relevance
-            is_relevant, confidence, reasoning = self.ai_filter.is_ai_relevant(article_data)
-            
-            # Create article record
-            article = Article(
-                title=article_data['title'],
-                url=article_data['url'],
-                source_name=article_data['source_name'],
-                source_domain=article_data['source_domain'],
-                published_at=article_data['published_at'],
-                content=article_data.get('summary', ''),
-                is_ai_relevant=is_relevant,
-                ai_confidence=confidence,
-                credibility_score=article_data.get('credibility', 80),
-                is_verified=True if article_data.get('credibility', 0) >= settings.verification_threshold else False,
-                verification_reason=reasoning
-            )
+            # Step 1: AI relevance (classified in batch by run_news_pipeline)
+            if not verdict[0]:
+                return False  # Not AI-related; the stored row is all that's needed
             
-            db.add(article)
-            db.commit()
+            # Steps 2 and 3: Generate summary, send notifications
+            return await self._summarize_and_send(article_id, article_data)
             
-            if not is_relevant:
-                return False  # Not AI-related
-            
-            # Step 2: Generate summary
-            print(f"📝 Summarizing: {article_data['title'][:60]}...")
-            summary = self.summarizer.summarize(article_data)
-            article.summary = f"{summary['headline']}\n\n{summary['why_matters']}"
-            db.commit()
-            
-            # Step 3: Send notifications
-            print(f"📤 Broadcasting to subscribers...")
-            success_count = await self.telegram.broadcast_news(
-                article_data,
-                summary
+        except Exception as e:
+            logger.exception("❌ Error processing article: %s", e)
+            return False
+    
+    async def _summarize_and_send(self, article_id: int, article_data: Dict) -> bool:
+        """Summarize a stored article, store the summary, then broadcast it"""
+        logger.info("📝 Summarizing: %.60s...", article_data['title'])
+        summary = await self.summarizer.summarize(article_data)
+        async with AsyncSessionLocal() as db:
+            await db.execute(
+                update(Article).where(Article.id == article_id)
+                .values(summary=f"{summary['headline']}\n\n{summary['why_matters']}")
             )
-            
-            if success_count > 0:
-                article.notification_sent = True
-                article.sent_at = datetime.utcnow()
-                db.commit()
-                return True
-            
+            await db.commit()
+        
+        return await self._broadcast_and_record(article_id, article_data, summary)
+    
+    async def _broadcast_and_record(self, article_id: int, article_data: Dict, summary: Dict) -> bool:
+        """
+        Broadcast a summarized article and mark its row sent once it is done
+        
+        An article is done when anyone got it, or when nobody is subscribed
+        (sent_at then stays empty), since retrying can't reach anyone either.
+        
+        Returns:
+            True if article is done, False if the broadcast should be retried
+        """
+        logger.info("📤 Broadcasting to subscribers...")
+        success_count = await self.telegram.broadcast_news(
+            article_data,
+            summary
+        )
+        
+        if success_count == 0:
             return False
-            
+        
+        values = {'notification_sent': True}
+        if success_count is not None:
+            values['sent_at'] = datetime.now(timezone.utc)
+        async with AsyncSessionLocal() as db:
+            await db.execute(update(Article).where(Article.id == article_id).values(**values))
+            await db.commit()
+        return True
+    
+    async def _resend_article(self, article_id: int, article_data: Dict, summary: Optional[Dict]) -> bool:
+        """Send a stored relevant article, reusing its summary when it has one"""
+        try:
+            if summary is None:
+                return await self._summarize_and_send(article_id, article_data)
+            return await self._broadcast_and_record(article_id, article_data, summary)
         except Exception as e:
-            print(f"❌ Error processing article: {e}")
-            import traceback
-            traceback.print_exc()
+            logger.exception("❌ Error resending article: %s", e)
             return False
-        finally:
-            db.close()
+    
+    def _settle_sends(self, items: List[Tuple[int, Dict, object]], results: List) -> set:
+        """
+        Count failed broadcasts and work out which articles are finished
+        
+        Args:
+            items: (article_id, article_data, ...) that were processed or resent
+            results: Their outcomes, True when done
+        
+        Returns:
+            URLs that need no more attempts: done, or failed MAX_SEND_ATTEMPTS times
+        """
+        done_urls = set()
+        for (article_id, article_data, _), was_sent in zip(items, results):
+            if was_sent is True:
+                self._send_attempts.pop(article_id, None)
+                done_urls.add(article_data['url'])
+                continue
+            
+            attempts = self._send_attempts.get(article_id, 0) + 1
+            if attempts >= MAX_SEND_ATTEMPTS:
+                logger.warning("⚠️ Giving up on %.60s... after %d failed attempts", article_data['title'], attempts)
+                self._send_attempts.pop(article_id, None)
+                done_urls.add(article_data['url'])
+            else:
+                self._send_attempts[article_id] = attempts
+        return done_urls
     
     async def run_news_pipeline(self):
         """Run the complete news pipeline"""
-        print("\n" + "="*60)
-        print(f"🔄 Running news pipeline at {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-        print("="*60 + "\n")
+        logger.info("🔄 Running news pipeline at %s", datetime.now().strftime('%Y-%m-%d %H:%M:%S'))
         
         try:
-            # Step 1: Fetch articles
-            print("📡 Fetching articles from RSS feeds...")
-            articles = self.rss_fetcher.fetch_all()
-            print(f"📊 Fetched {len(articles)} articles\n")
+            # Step 1 + 2: Fetch articles and classify them as feeds arrive
+            logger.info("📡 Fetching and classifying articles from RSS feeds...")
+            classified, unsent = await self._fetch_and_classify()
             
-            if not articles:
-                print ("⚠️ No new articles found")
+            if not classified and not unsent:
+                logger.warning("⚠️ No new articles found")
+                self.rss_fetcher.commit_validators()
+                self.rss_fetcher.save_state()
                 return
             
-            # Step 2: Process each article
-            sent_count = 0
-            for i, article_data in enumerate(articles[:settings.max_articles_per_cycle], 1):
-                print(f"[{i}/{len(articles)}] Processing: {article_data['title'][:60]}...")
-                
-                was_sent = await self.process_single_article(article_data)
-                if was_sent:
-                    sent_count += 1
-                    
-                # Small delay to avoid rate limits
-                await asyncio.sleep(2)
+            # Step 3: Store every article in one statement; only relevant ones
+            # this run actually inserted go on (a concurrent run may own the rest)
+            inserted = await self._store_articles(classified)
+            relevant = [
+                (inserted[article_data['url']], article_data, verdict)
+                for article_data, verdict in classified
+                if verdict[0] and article_data['url'] in inserted
+            ]
+            
+            # Step 4: Summarize and broadcast relevant articles concurrently, along
+            # with stored relevant articles that never went out
+            # (Telegram pacing is enforced by the notifier's send queue)
+            semaphore = asyncio.Semaphore(settings.pipeline_concurrency)
+            
+            async def process(i: int, article_id: int, article_data: Dict, verdict: Tuple[bool, float, str]) -> bool:
+                async with semaphore:
+                    logger.info("[%d/%d] Processing: %.60s...", i, len(relevant), article_data['title'])
+                    return await self.process_single_article(article_id, article_data, verdict)
             
-            print(f"\n✅ Pipeline complete! Sent {sent_count} notifications")
+            async def resend(article_id: int, article_data: Dict, summary: Optional[Dict]) -> bool:
+                async with semaphore:
+                    logger.info("🔁 Retrying unsent article: %.60s...", article_data['title'])
+                    return await self._resend_article(article_id, article_data, summary)
+            
+            results = await asyncio.gather(
+                *(process(i, *item) for i, item in enumerate(relevant, 1)),
+                *(resend(*item) for item in unsent),
+                return_exceptions=True
+            )
+            sent_count = sum(1 for was_sent in results if was_sent is True)
+            done_urls = self._settle_sends(relevant + unsent, results)
+            
+            # Done with now, so later cycles can skip them without a DB lookup.
+            # Articles that failed to store or send stay unseen; the DB check
+            # next cycle retries them
+            self.rss_fetcher.mark_seen([
+                article_data for article_data, verdict in classified
+                if article_data['url'] in inserted and (not verdict[0] or article_data['url'] in done_urls)
+            ])
+            self.rss_fetcher.mark_seen([article_data for _, article_data, _ in unsent if article_data['url'] in done_urls])
+            
+            # Conditional GETs may skip feeds once their articles are stored;
+            # failed sends are retried from the DB, not from the feed
+            if all(article_data['url'] in inserted for article_data, _ in classified):
+                self.rss_fetcher.commit_validators()
+            else:
+                self.rss_fetcher.discard_validators()
+            self.rss_fetcher.save_state()
+            
+            logger.info("✅ Pipeline complete! Sent %d notifications", sent_count)
+            logger.info("🗃️ Summary cache: %s", self.summarizer.cache_stats())
             
         except Exception as e:
-            print(f"❌ Pipeline error: {e}")
-            import traceback
-            traceback.print_exc()
+            logger.exception("❌ Pipeline error: %s", e)
 
     async def run_daily_digest(self):
         """Generate and send daily digest"""
-        print("\n" + "="*60)
-        print(f"🗞️ Running Daily Digest at {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-        print("="*60 + "\n")
+        logger.info("🗞️ Running Daily Digest at %s", datetime.now().strftime('%Y-%m-%d %H:%M:%S'))
         
         try:
             db = SessionLocal()
@@ -164,33 +402,34 @@ class NewsAgentScheduler:
             db.close()
             
             if not recent_articles:
-                print("⚠️ No recent high-relevance articles found for digest.")
+                logger.warning("⚠️ No recent high-relevance articles found for digest.")
                 return
             
-            print(f"📊 Found {len(recent_articles)} candidates for daily digest")
+            logger.info("📊 Found %d candidates for daily digest", len(recent_articles))
+            
+            # Keep the strongest stories by confidence and source credibility
+            recent_articles = top_articles(recent_articles, n=10)
             
             # Generate digest content
             digest = self.summarizer.generate_daily_digest(recent_articles)
             
             if not digest:
-                print("❌ Failed to generate digest content.")
+                logger.error("❌ Failed to generate digest content.")
                 return
                 
             # Send digest
-            await self.telegram.send_daily_digest(digest)
-            print("✅ Daily digest sent successfully!")
+            await self.telegram.send_daily_digest(digest, articles=recent_articles)
+            logger.info("✅ Daily digest sent successfully!")
             
         except Exception as e:
-            print(f"❌ Daily digest error: {e}")
-            import traceback
-            traceback.print_exc()
+            logger.exception("❌ Daily digest error: %s", e)
     
     async def start(self):
         """Start the scheduler"""
-        print("\n🤖 Starting AI News Agent Scheduler...")
-        print(f"⏰ Polling interval: {settings.polling_interval} seconds ({settings.polling_interval // 60} minutes)")
-        print(f"🎯 AI relevance threshold: {settings.ai_relevance_threshold}%")
-        print(f"✅ Credibility threshold: {settings.verification_threshold}%\n")
+        logger.info("🤖 Starting AI News Agent Scheduler...")
+        logger.info("⏰ Polling interval: %d seconds (%d minutes)", settings.polling_interval, settings.polling_interval // 60)
+        logger.info("🎯 AI relevance threshold: %d%%", settings.ai_relevance_threshold)
+        logger.info("✅ Credibility threshold: %d%%", settings.verification_threshold)
         
         # Run immediately on startup
         asyncio.create_task(self.run_news_pipeline())
@@ -213,14 +452,14 @@ class NewsAgentScheduler:
             name='Daily Digest',
             replace_existing=True
         )
-        print("📅 Daily Digest scheduled for 09:00 UTC")
+        logger.info("📅 Daily Digest scheduled for 09:00 UTC")
         
         # Start scheduler
         self.scheduler.start()
-        print("✅ Scheduler started successfully!\n")
+        logger.info("✅ Scheduler started successfully!")
         
         # Also run the Telegram bot
-        print("🤖 Starting Telegram bot...")
+        logger.info("🤖 Starting Telegram bot...")
         await self.telegram.start()
 
 
@@ -235,13 +474,16 @@ async def main():
         stop_event = asyncio.Event()
         await stop_event.wait()
     except (KeyboardInterrupt, SystemExit):
-        print("\n👋 Shutting down gracefully...")
+        logger.info("👋 Shutting down gracefully...")
         # Cleanup
+        agent.rss_fetcher.save_state()
+        await close_session_pool()
         await agent.telegram.stop()
         agent.scheduler.shutdown()
 
 
 if __name__ == "__main__":
+    setup_logging()
     try:
         asyncio.run(main())
     except KeyboardInterrupt:
@@ -3,26 +3,40 @@ Database models and setup
 Using SQLAlchemy ORM with SQLite
 """
 
-from sqlalchemy import create_engine, Column, Integer, String, Text, DateTime, Boolean, Float
+from sqlalchemy import create_engine, event, func, make_url, select, Column, Index, Integer, String, Text, DateTime, Boolean, Float
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
-from datetime import datetime, timedelta
-from typing import List
-from config.settings import settings
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional
+from config.settings import get_settings
+
+settings = get_settings()
 
 Base = declarative_base()
 
 
+def _utcnow() -> datetime:
+    """Current time as an aware UTC datetime (utcnow() is deprecated)"""
+    return datetime.now(timezone.utc)
+
+
 class Article(Base):
     """News article model"""
     __tablename__ = "articles"
+    __table_args__ = (
+        # Lets get_recent_articles range-scan the cutoff and read it back in order
+        Index("ix_articles_relevant_verified_published", "is_ai_relevant", "is_verified", "published_at"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String(500), nullable=False)
     url = Column(String(1000), unique=True, nullable=False, index=True)
     source_name = Column(String(200), nullable=False)
     source_domain = Column(String(200), nullable=False)
-    published_at = Column(DateTime, nullable=False)
+    published_at = Column(DateTime(timezone=True), nullable=False)
     content = Column(Text)
     summary = Column(Text)
     
@@ -35,11 +49,11 @@ class Article(Base):
     
     # Notification status
     notification_sent = Column(Boolean, default=False)
-    sent_at = Column(DateTime, nullable=True)
+    sent_at = Column(DateTime(timezone=True), nullable=True)
     
     # Metadata
-    created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    created_at = Column(DateTime(timezone=True), default=_utcnow)
+    updated_at = Column(DateTime(timezone=True), default=_utcnow, onupdate=_utcnow)
     
     def __repr__(self):
         return f"<Article(id={self.id}, title='{self.title[:50]}...', source='{self.source_name}')>"
@@ -48,6 +62,10 @@ class Article(Base):
 class Subscriber(Base):
     """Telegram subscriber model"""
     __tablename__ = "subscribers"
+    __table_args__ = (
+        # Covers the broadcast query (chat_id of active subscribers) without touching the table
+        Index("ix_sub_active_chat", "is_active", "chat_id"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     chat_id = Column(String(100), unique=True, nullable=False, index=True)
@@ -55,14 +73,14 @@ class Subscriber(Base):
     first_name = Column(String(100), nullable=True)
     last_name = Column(String(100), nullable=True)
     
-    # Subscription status
+    # Subscription status (timestamps come from the database clock)
     is_active = Column(Boolean, default=True)
-    subscribed_at = Column(DateTime, default=datetime.utcnow)
-    unsubscribed_at = Column(DateTime, nullable=True)
+    subscribed_at = Column(DateTime(timezone=True), server_default=func.now())
+    unsubscribed_at = Column(DateTime(timezone=True), nullable=True)
     
     # Metadata
-    created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
     
     def __repr__(self):
         return f"<Subscriber(chat_id='{self.chat_id}', username='{self.username}', active={self.is_active})>"
@@ -75,7 +93,7 @@ class NotificationLog(Base):
     id = Column(Integer, primary_key=True, index=True)
     article_id = Column(Integer, nullable=False, index=True)
     chat_id = Column(String(100), nullable=False)
-    sent_at = Column(DateTime, default=datetime.utcnow)
+    sent_at = Column(DateTime(timezone=True), default=_utcnow)
     success = Column(Boolean, default=True)
     error_message = Column(Text, nullable=True)
     
@@ -83,16 +101,61 @@ class NotificationLog(Base):
         return f"<NotificationLog(article_id={self.article_id}, chat_id='{self.chat_id}', success={self.success})>"
 
 
+def _pool_args(url: str) -> Dict:
+    """Connection pool sizing; in-memory SQLite uses a single-connection pool that takes none"""
+    parsed = make_url(url)
+    if parsed.get_backend_name() == "sqlite" and (
+        parsed.database in (None, "", ":memory:") or parsed.query.get("mode") == "memory"
+    ):
+        return {}
+    return {"pool_size": 10, "max_overflow": 5}
+
+
 # Database engine and session
 engine = create_engine(
     settings.database_url,
     connect_args={"check_same_thread": False} if "sqlite" in settings.database_url else {},
-    echo=settings.debug_mode
+    pool_pre_ping=True,
+    echo=settings.debug_mode,
+    **_pool_args(settings.database_url)
 )
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 
+def _async_database_url(url: str) -> str:
+    """Map the configured database URL onto its asyncio driver"""
+    if url.startswith("sqlite:"):
+        return url.replace("sqlite:", "sqlite+aiosqlite:", 1)
+    if url.startswith("postgresql:"):
+        return url.replace("postgresql:", "postgresql+asyncpg:", 1)
+    return url
+
+
+# Async engine for code running on the event loop (bot handlers)
+async_engine = create_async_engine(_async_database_url(settings.database_url), echo=settings.debug_mode)
+
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+
+def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    """Tune each new SQLite connection for concurrent readers and cheap commits"""
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    cursor.execute("PRAGMA cache_size=-65536")
+    cursor.execute("PRAGMA mmap_size=268435456")
+    cursor.execute("PRAGMA busy_timeout=5000")
+    cursor.execute("PRAGMA foreign_keys=ON")
+    cursor.close()
+
+
+if engine.dialect.name == "sqlite":
+    event.listen(engine, "connect", _set_sqlite_pragmas)
+    event.listen(async_engine.sync_engine, "connect", _set_sqlite_pragmas)
+
+
 def get_db():
     """Get database session (for dependency injection)"""
     db = SessionLocal()
@@ -104,7 +167,7 @@ def get_db():
 
 def get_recent_articles(db, hours: int = 24) -> List[Article]:
     """Get AI-relevant articles from the last N hours"""
-    cutoff_time = datetime.utcnow() - timedelta(hours=hours)
+    cutoff_time = _utcnow() - timedelta(hours=hours)
     return db.query(Article).filter(
         Article.published_at >= cutoff_time,
         Article.is_ai_relevant == True,
@@ -112,9 +175,84 @@ def get_recent_articles(db, hours: int = 24) -> List[Article]:
     ).order_by(Article.published_at.desc()).all()
 
 
+async def upsert_subscriber(db, chat_id: str, username: str = None, first_name: str = None, last_name: str = None) -> Optional[str]:
+    """
+    Subscribe a chat with a single INSERT ... ON CONFLICT statement
+    
+    Whether the chat is new is read from the existing row inside the same
+    transaction, since RETURNING only sees the row after the upsert
+    
+    Returns:
+        'new' for a new subscriber, 'reactivated' for a returning one,
+        or None if the chat was already subscribed
+    """
+    insert = postgresql_insert if engine.dialect.name == "postgresql" else sqlite_insert
+    
+    existing_id = await db.scalar(select(Subscriber.id).where(Subscriber.chat_id == chat_id))
+    
+    # Timestamps are set explicitly so tables created before the server
+    # defaults existed get them too
+    stmt = insert(Subscriber).values(
+        chat_id=chat_id,
+        username=username,
+        first_name=first_name,
+        last_name=last_name,
+        is_active=True,
+        subscribed_at=func.now(),
+        created_at=func.now(),
+        updated_at=func.now()
+    )
+    # Only inactive rows are touched, so an active subscriber returns no row
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[Subscriber.chat_id],
+        set_={
+            "is_active": True,
+            "subscribed_at": func.now(),
+            "unsubscribed_at": None,
+            "updated_at": func.now()
+        },
+        where=Subscriber.is_active == False
+    ).returning(Subscriber.id)
+    
+    row = (await db.execute(stmt)).first()
+    await db.commit()
+    
+    if row is None:
+        return None
+    return "new" if existing_id is None else "reactivated"
+
+
+async def insert_new_articles(db, rows: List[Dict]) -> Dict[str, int]:
+    """
+    Insert articles with one INSERT ... ON CONFLICT (url) DO NOTHING statement
+    
+    Returns:
+        {url: id} for the rows actually inserted; URLs that were already
+        stored (e.g. by a concurrent run) are left out
+    """
+    if not rows:
+        return {}
+    
+    insert = postgresql_insert if engine.dialect.name == "postgresql" else sqlite_insert
+    
+    stmt = insert(Article).values(rows).on_conflict_do_nothing(
+        index_elements=[Article.url]
+    ).returning(Article.id, Article.url)
+    
+    result = await db.execute(stmt)
+    inserted = {row.url: row.id for row in result}
+    await db.commit()
+    return inserted
+
+
 def init_db():
     """Initialize database tables"""
     Base.metadata.create_all(bind=engine)
+    
+    # create_all skips indexes on tables that already exist
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=engine, checkfirst=True)
     print("✅ Database initialized successfully")
 
 
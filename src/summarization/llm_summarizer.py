@@ -3,35 +3,76 @@ News Summarizer using Gemini
 Generates concise, non-technical summaries for Telegram
 """
 
+import asyncio
+import copy
 import google.generativeai as genai
-import json
-from typing import Dict, List
-from config.settings import settings
+import hashlib
+import logging
+import numpy as np
+import orjson
+import re
+from cachetools import TTLCache
+from typing import Dict, List, Optional, Set, Tuple
+from config.settings import get_settings
+from src.gemini_client import get_model
+from src.summarization.semantic_cache import SemanticCache
+
+logger = logging.getLogger(__name__)
+
+
+class _CountingTTLCache(TTLCache):
+    """TTLCache that counts lookups and entries dropped for space or age"""
+    
+    def __init__(self, maxsize: int, ttl: float):
+        super().__init__(maxsize=maxsize, ttl=ttl)
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+    
+    def lookup(self, key):
+        """get() that records a hit or a miss"""
+        value = self.get(key)
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+    
+    def popitem(self):
+        item = super().popitem()
+        self.evictions += 1
+        return item
+    
+    def expire(self, time=None):
+        expired = super().expire(time)
+        self.evictions += len(expired)
+        return expired
+
+
+# Parsed Gemini responses keyed by exact prompt, so re-crawled or
+# duplicated articles don't cost another API call; news ages out within a day
+_response_cache = _CountingTTLCache(maxsize=10_000, ttl=86400)
+
+# Markdown code fence Gemini sometimes wraps JSON responses in
+_FENCE = re.compile(r"^```(?:json)?\s*|\s*```$", re.S)
 
 
 class NewsSummarizer:
     """Summarize news articles using Gemini"""
     
-    def __init__(self):
-        """Initialize Gemini model"""
-        genai.configure(api_key=settings.gemini_api_key)
-        self.model = genai.GenerativeModel('gemini-1.5-flash')
+    # Shared by every request rather than rebuilt per call
+    _GEN_CFG = genai.types.GenerationConfig(
+        temperature=0.3,  # Low creativity, factual
+    )
+    _DIGEST_GEN_CFG = genai.types.GenerationConfig(
+        temperature=0.4,
+    )
     
-    def summarize(self, article: Dict) -> Dict:
-        """
-        Generate summary for article
-        
-        Returns:
-            {
-                'headline': '...',
-                'why_matters': '...'
-            }
-        """
-        prompt = f"""
+    _SUMMARY_PROMPT_TMPL = """
 You are summarizing AI news for a general audience (non-technical users).
 
-Article Title: {article.get('title', '')}
-Article Summary: {article.get('summary', '')[:1000]}
+Article Title: {title}
+Article Summary: {summary}
 
 Create a notification with:
 
@@ -52,40 +93,148 @@ Respond ONLY with valid JSON in this format:
     "why_matters": "simple explanation of impact"
 }}
 """
+    
+    _DIGEST_ARTICLE_TMPL = "ID: {id}\nTitle: {title}\nSummary: {summary}\n\n"
+    
+    _DIGEST_PROMPT_TMPL = """
+You are writing a Daily AI News Digest for a Telegram channel.
+Here are the top stories from the last 24 hours:
+
+{articles}
+
+Task:
+1. Select the top 3-5 most important stories.
+2. Write a short 1-sentence headline for each.
+3. Write a very brief 1-sentence impact statement for each.
+4. Write a catchy intro (e.g., "Good morning! Here's what happened in AI today:")
+5. Write a brief outro.
+
+Respond ONLY with valid JSON in this format:
+{{
+    "intro": "Good morning! ...",
+    "items": [
+        {{
+            "id": 123, 
+            "headline": "headline here",
+            "impact": "impact here"
+        }}
+    ],
+    "outro": "Stay tuned for more!"
+}}
+"""
+    
+    def __init__(self):
+        """Initialize Gemini model"""
+        self.model = get_model()
         
+        # Second tier for near-duplicates that miss the exact-prompt cache
+        self.semantic_cache = SemanticCache(threshold=get_settings().semantic_cache_threshold)
+    
+    def _cache_key(self, prompt: str, temperature: float) -> str:
+        """Key a Gemini call by model, temperature and exact prompt text"""
+        payload = orjson.dumps(
+            {"m": self.model.model_name, "t": temperature, "p": prompt},
+            option=orjson.OPT_SORT_KEYS
+        )
+        return hashlib.sha256(payload).hexdigest()
+    
+    def _summary_prompt(self, article: Dict) -> str:
+        """Build the single-article summary prompt"""
+        return self._SUMMARY_PROMPT_TMPL.format(
+            title=article.get('title', ''),
+            summary=article.get('summary', '')[:1000]
+        )
+    
+    def _exact_lookup(self, article: Dict) -> Tuple[Optional[Dict], str]:
+        """
+        Check the exact-prompt cache for an article's summary
+        
+        Returns:
+            (cached summary or None, cache key to store a fresh summary under)
+        """
+        cache_key = self._cache_key(self._summary_prompt(article), 0.3)
+        cached = _response_cache.lookup(cache_key)
+        return (dict(cached) if cached is not None else None), cache_key
+    
+    @staticmethod
+    def _embedding_text(article: Dict) -> str:
+        """Text an article is embedded by for the semantic cache"""
+        return f"{article.get('title', '')}\n{article.get('summary', '')[:1000]}"
+    
+    def cache_stats(self) -> Dict[str, int]:
+        """
+        Hit, miss, size and eviction counts for both summary caches
+        
+        Expired entries are swept first, so sizes reflect live entries.
+        """
+        _response_cache.expire()
+        self.semantic_cache.expire()
+        return {
+            'hits': _response_cache.hits,
+            'misses': _response_cache.misses,
+            'size': len(_response_cache),
+            'evictions': _response_cache.evictions,
+            **self.semantic_cache.stats,
+            'semantic_size': len(self.semantic_cache)
+        }
+    
+    def _remember(self, cache_key: str, vector: Optional[np.ndarray], summary: Dict):
+        """Store a Gemini summary in both cache tiers"""
+        _response_cache[cache_key] = summary
+        if vector is not None:
+            self.semantic_cache.add(vector, summary)
+    
+    async def summarize(self, article: Dict) -> Dict:
+        """
+        Generate summary for article
+        
+        Returns:
+            {
+                'headline': '...',
+                'why_matters': '...'
+            }
+        """
+        cached, cache_key = self._exact_lookup(article)
+        if cached is not None:
+            return cached
+        
+        # Rephrasings of the same announcement reuse its summary
+        vector = await self.semantic_cache.embed(self._embedding_text(article))
+        if vector is not None:
+            cached = self.semantic_cache.lookup(vector)
+            if cached is not None:
+                return cached
+        
+        return await self._summarize_uncached(article, cache_key, vector)
+    
+    async def _summarize_uncached(self, article: Dict, cache_key: str, vector: Optional[np.ndarray]) -> Dict:
+        """Summarize one article with its own Gemini call"""
         try:
-            response = self.model.generate_content(
-                prompt,
-                generation_config=genai.types.GenerationConfig(
-                    temperature=0.3,  # Low creativity, factual
-                )
+            response = await self.model.generate_content_async(
+                self._summary_prompt(article),
+                generation_config=self._GEN_CFG
             )
             
-            # Parse JSON response
-            text = response.text.strip()
-            # Handle potential markdown code blocks
-            if text.startswith('```json'):
-                text = text[7:]
-            if text.endswith('```'):
-                text = text[:-3]
-                
-            result = json.loads(text)
+            # Parse JSON response, minus any markdown code fence
+            result = orjson.loads(_FENCE.sub("", response.text.strip()))
             
-            return {
+            summary = {
                 'headline': result.get('headline', article['title']),
                 'why_matters': result.get('why_matters', 'Significant development in AI.')
             }
+            # Only real responses are cached; fallbacks below are retried next time
+            self._remember(cache_key, vector, summary)
+            return dict(summary)
             
-        except json.JSONDecodeError as e:
-            print(f"⚠️ Failed to parse Gemini summary as JSON: {e}")
-            print(f"Response: {response.text}")
+        except orjson.JSONDecodeError as e:
+            logger.warning("⚠️ Failed to parse Gemini summary as JSON: %s\nResponse: %s", e, response.text)
             # Fallback to original title
             return {
                 'headline': article['title'],
                 'why_matters': 'Significant development in the AI field.'
             }
         except Exception as e:
-            print(f"❌ Summarization error: {e}")
+            logger.warning("❌ Summarization error: %s", e)
             return {
                 'headline': article['title'],
                 'why_matters': 'Significant development in the AI field.'
@@ -107,58 +256,243 @@ Respond ONLY with valid JSON in this format:
         if not articles:
             return None
             
-        articles_text = ""
-        for i, art in enumerate(articles[:10], 1):  # Limit to top 10 to fit context
-            summary_text = art.summary[:200] if art.summary else "No summary available."
-            articles_text += f"ID: {art.id}\nTitle: {art.title}\nSummary: {summary_text}\n\n"
-            
-        prompt = f"""
-You are writing a Daily AI News Digest for a Telegram channel.
-Here are the top stories from the last 24 hours:
-
-{articles_text}
-
-Task:
-1. Select the top 3-5 most important stories.
-2. Write a short 1-sentence headline for each.
-3. Write a very brief 1-sentence impact statement for each.
-4. Write a catchy intro (e.g., "Good morning! Here's what happened in AI today:")
-5. Write a brief outro.
-
-Respond ONLY with valid JSON in this format:
-{{
-    "intro": "Good morning! ...",
-    "items": [
-        {{
-            "id": 123, 
-            "headline": "headline here",
-            "impact": "impact here"
-        }}
-    ],
-    "outro": "Stay tuned for more!"
-}}
-"""
+        articles_text = "".join(
+            self._DIGEST_ARTICLE_TMPL.format(
+                id=art.id,
+                title=art.title,
+                summary=art.summary[:200] if art.summary else "No summary available."
+            )
+            for art in articles[:10]  # Limit to top 10 to fit context
+        )
+        prompt = self._DIGEST_PROMPT_TMPL.format(articles=articles_text)
+        
+        cache_key = self._cache_key(prompt, 0.4)
+        cached = _response_cache.lookup(cache_key)
+        if cached is not None:
+            # Deep copy: the digest's items list must not be shared with callers
+            return copy.deepcopy(cached)
+        
         try:
             response = self.model.generate_content(
                 prompt,
-                generation_config=genai.types.GenerationConfig(
-                    temperature=0.4,
-                )
+                generation_config=self._DIGEST_GEN_CFG
             )
             
-            text = response.text.strip()
-            if text.startswith('```json'):
-                text = text[7:]
-            if text.endswith('```'):
-                text = text[:-3]
-                
-            return json.loads(text)
+            digest = orjson.loads(_FENCE.sub("", response.text.strip()))
+            _response_cache[cache_key] = digest
+            return copy.deepcopy(digest)
             
         except Exception as e:
-            print(f"❌ Digest generation error: {e}")
+            logger.exception("❌ Digest generation error: %s", e)
             return None
 
 
+class BatchedNewsSummarizer:
+    """
+    Coalesce concurrent summarize() calls into multi-article Gemini prompts
+    
+    Exact-cache misses wait up to `max_queue_time` seconds for company,
+    then are handled `max_batch_size` at a time: one embedding request and
+    one similarity pass over the whole batch for the semantic cache, and
+    one Gemini request for what is still missing. Articles the batch
+    response doesn't cover fall back to their own summarize call.
+    Concurrent calls for the same article share one result.
+    """
+    
+    # JSON mode makes Gemini return a bare array
+    _GEN_CFG = genai.types.GenerationConfig(
+        temperature=0.3,  # Low creativity, factual
+        response_mime_type='application/json'
+    )
+    
+    _BATCH_ARTICLE_TMPL = """
+Article {idx}:
+Title: {title}
+Summary: {summary}
+"""
+    
+    _BATCH_PROMPT_TMPL = """
+You are summarizing AI news for a general audience (non-technical users).
+For EACH article below, create a notification with:
+
+1. Headline (1-2 sentences, factual, no hype)
+2. Why it matters (1-2 sentences explaining impact in simple terms)
+
+Requirements:
+- Use simple language (no jargon like "parameters", "tokens", etc.)
+- Explain any technical terms you must use
+- Be neutral and factual
+- No speculation or opinion
+- Keep under 150 words per article
+- Focus on real-world impact
+{articles}
+Respond ONLY with a valid JSON array of {count} objects, one per article, in this format:
+[
+    {{"idx": 1, "headline": "clear, factual headline here", "why_matters": "simple explanation of impact"}}
+]
+"""
+    
+    def __init__(self, summarizer: Optional[NewsSummarizer] = None,
+                 max_batch_size: int = 8, max_queue_time: float = 0.5):
+        self.summarizer = summarizer or NewsSummarizer()
+        self.max_batch_size = max_batch_size
+        self.max_queue_time = max_queue_time
+        
+        # (article, cache_key, future) waiting for the next flush
+        self._pending: List[Tuple[Dict, str, asyncio.Future]] = []
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        
+        # Summaries being produced right now, keyed by article identity
+        self._in_flight: Dict[str, asyncio.Future] = {}
+        
+        # Running batches; the loop only keeps weak references to tasks
+        self._tasks: Set[asyncio.Task] = set()
+    
+    async def summarize(self, article: Dict) -> Dict:
+        """Summarize an article, sharing a Gemini call with concurrent requests"""
+        ident = hashlib.sha256(
+            f"{article.get('title', '')}{article.get('url', '')}".encode()
+        ).hexdigest()
+        
+        # The same story from two feeds at once is only summarized once
+        shared = self._in_flight.get(ident)
+        if shared is not None:
+            return dict(await shared)
+        
+        future = asyncio.get_running_loop().create_future()
+        self._in_flight[ident] = future
+        try:
+            summary = await self._summarize(article)
+            future.set_result(summary)
+            return dict(summary)
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            # Waiters get the real error, not a cancellation
+            future.set_exception(e)
+            future.exception()  # Retrieved here, so no waiters isn't logged as unhandled
+            raise
+        finally:
+            del self._in_flight[ident]
+    
+    async def _summarize(self, article: Dict) -> Dict:
+        """Summarize an article from the exact cache or the next batch"""
+        cached, cache_key = self.summarizer._exact_lookup(article)
+        if cached is not None:
+            return cached
+        
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((article, cache_key, future))
+        
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.max_queue_time, self._flush)
+        
+        return await future
+    
+    def _flush(self):
+        """Send everything pending as one batch"""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        
+        batch, self._pending = self._pending, []
+        if batch:
+            task = asyncio.get_running_loop().create_task(self._run_batch(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+    
+    async def _run_batch(self, batch: List[Tuple[Dict, str, asyncio.Future]]):
+        """Summarize a batch with one embedding call and one Gemini call, then resolve its futures"""
+        try:
+            await self._resolve_batch(batch)
+        except Exception as e:
+            # Callers must not wait forever on a batch that blew up
+            for _, _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+    
+    async def _resolve_batch(self, batch: List[Tuple[Dict, str, asyncio.Future]]):
+        """Embed, look up and summarize a batch, resolving each future as its summary is ready"""
+        articles = [article for article, _, _ in batch]
+        semantic_cache = self.summarizer.semantic_cache
+        
+        # Rephrasings of stories already summarized reuse them; the whole
+        # batch is embedded and compared as one matrix
+        vectors = await semantic_cache.embed_many([self.summarizer._embedding_text(a) for a in articles])
+        hits = semantic_cache.lookup_many(vectors) if vectors is not None else [None] * len(batch)
+        misses = [i for i, hit in enumerate(hits) if hit is None]
+        
+        try:
+            results = await self._summarize_batch([articles[i] for i in misses])
+        except Exception as e:
+            logger.warning("⚠️ Batch summarization failed, summarizing individually: %s", e)
+            results = {}
+        # Batch results are numbered within the misses; map them back
+        fresh = {misses[idx - 1]: summary for idx, summary in results.items()}
+        
+        async def resolve(i: int, article: Dict, cache_key: str, future: asyncio.Future):
+            vector = vectors[i] if vectors is not None else None
+            summary = hits[i]
+            try:
+                if summary is None and i in fresh:
+                    summary = fresh[i]
+                    self.summarizer._remember(cache_key, vector, summary)
+                    summary = dict(summary)
+                elif summary is None:
+                    summary = await self.summarizer._summarize_uncached(article, cache_key, vector)
+            except Exception as e:
+                if not future.done():
+                    future.set_exception(e)
+                return
+            if not future.done():
+                future.set_result(summary)
+        
+        await asyncio.gather(*(resolve(i, *item) for i, item in enumerate(batch)))
+    
+    async def _summarize_batch(self, articles: List[Dict]) -> Dict[int, Dict]:
+        """
+        Summarize several articles in a single Gemini call
+        
+        Returns:
+            Summaries keyed by 1-based article index; articles missing from
+            the response are left out
+        """
+        if len(articles) <= 1:
+            return {}  # The single-article prompt is cached across cycles; use it
+        
+        articles_text = "".join(
+            self._BATCH_ARTICLE_TMPL.format(
+                idx=i,
+                title=article.get('title', ''),
+                summary=article.get('summary', '')[:1000]
+            )
+            for i, article in enumerate(articles, 1)
+        )
+        prompt = self._BATCH_PROMPT_TMPL.format(articles=articles_text, count=len(articles))
+        
+        response = await self.summarizer.model.generate_content_async(prompt, generation_config=self._GEN_CFG)
+        
+        summaries = {}
+        for item in orjson.loads(response.text):
+            idx = int(item.get('idx', 0))
+            if 1 <= idx <= len(articles) and item.get('headline') and item.get('why_matters'):
+                summaries[idx] = {'headline': item['headline'], 'why_matters': item['why_matters']}
+        
+        return summaries
+    
+    def cache_stats(self) -> Dict[str, int]:
+        """Hit, miss, size and eviction counts for both summary caches"""
+        return self.summarizer.cache_stats()
+    
+    def generate_daily_digest(self, articles: List[Dict]) -> Dict:
+        """Generate a daily digest (one call already, so nothing to batch)"""
+        return self.summarizer.generate_daily_digest(articles)
+
+
 if __name__ == "__main__":
     # Test the summarizer
     summarizer = NewsSummarizer()
@@ -169,6 +503,6 @@ if __name__ == "__main__":
     }
     
     print("Testing summarizer...")
-    result = summarizer.summarize(test_article)
+    result = asyncio.run(summarizer.summarize(test_article))
     print(f"\nHeadline: {result['headline']}")
     print(f"\nWhy it matters: {result['why_matters']}")
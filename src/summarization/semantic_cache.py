@@ -0,0 +1,134 @@
+"""
+Semantic summary cache
+Reuses summaries for near-duplicate stories (reblogs, rephrased announcements)
+"""
+
+import logging
+import time
+import numpy as np
+import google.generativeai as genai
+from typing import Dict, List, Optional, Tuple
+
+EMBEDDING_MODEL = 'models/text-embedding-004'
+
+logger = logging.getLogger(__name__)
+
+
+class SemanticCache:
+    """Nearest-neighbour cache of summaries over Gemini text embeddings"""
+    
+    def __init__(self, threshold: float = 0.92, ttl: int = 86400, maxsize: int = 10_000):
+        """
+        Args:
+            threshold: Minimum cosine similarity to reuse a stored summary
+            ttl: Seconds a stored summary stays reusable
+            maxsize: Summaries kept at most; the oldest are dropped first
+        """
+        self.threshold = threshold
+        self.ttl = ttl
+        self.maxsize = maxsize
+        
+        # Ring buffer of unit-length embeddings, allocated at maxsize rows on
+        # the first add; slot _head holds the oldest of _size live entries
+        self._vectors: Optional[np.ndarray] = None
+        self._payloads: List[Optional[Dict]] = [None] * maxsize
+        self._created = np.zeros(maxsize)
+        self._head = 0
+        self._size = 0
+        
+        self.stats = {'semantic_hits': 0, 'semantic_misses': 0, 'semantic_evictions': 0}
+    
+    async def embed(self, text: str) -> Optional[np.ndarray]:
+        """Embed text as a unit vector (None if the embedding call fails)"""
+        try:
+            result = await genai.embed_content_async(model=EMBEDDING_MODEL, content=text)
+        except Exception as e:
+            logger.warning("⚠️ Embedding failed, skipping semantic cache: %s", e)
+            return None
+        
+        vector = np.asarray(result['embedding'], dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else None
+    
+    async def embed_many(self, texts: List[str]) -> Optional[np.ndarray]:
+        """Embed texts with one request, as a matrix of unit rows (None on failure)"""
+        if not texts:
+            return None
+        
+        try:
+            result = await genai.embed_content_async(model=EMBEDDING_MODEL, content=texts)
+        except Exception as e:
+            logger.warning("⚠️ Embedding failed, skipping semantic cache: %s", e)
+            return None
+        
+        vectors = np.asarray(result['embedding'], dtype=np.float32)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        # Zero vectors can't match anything; leave them as zeros
+        return np.divide(vectors, norms, out=np.zeros_like(vectors), where=norms > 0)
+    
+    def lookup(self, vector: np.ndarray) -> Optional[Dict]:
+        """Get the stored summary most similar to vector, if similar enough"""
+        return self.lookup_many(vector[np.newaxis, :])[0]
+    
+    def lookup_many(self, vectors: np.ndarray) -> List[Optional[Dict]]:
+        """lookup() for each row of vectors, scored with a single matrix product"""
+        self.expire()
+        
+        results: List[Optional[Dict]] = [None] * len(vectors)
+        if self._size:
+            # Dot products of unit vectors are cosine similarities; column j
+            # is the j-th oldest entry, scored over views of the live rows
+            scores = np.concatenate([vectors @ self._vectors[start:end].T for start, end in self._live_ranges()], axis=1)
+            best = np.argmax(scores, axis=1)
+            for i, j in enumerate(best):
+                if scores[i, j] >= self.threshold:
+                    results[i] = dict(self._payloads[(self._head + j) % self.maxsize])
+        
+        hits = sum(result is not None for result in results)
+        self.stats['semantic_hits'] += hits
+        self.stats['semantic_misses'] += len(results) - hits
+        return results
+    
+    def add(self, vector: np.ndarray, payload: Dict):
+        """Store a summary under its embedding, overwriting the oldest when full"""
+        if self._vectors is None:
+            self._vectors = np.zeros((self.maxsize, len(vector)), dtype=np.float32)
+        
+        if self._size == self.maxsize:
+            self._drop_oldest(1)
+        
+        slot = (self._head + self._size) % self.maxsize
+        self._vectors[slot] = vector
+        self._payloads[slot] = dict(payload)
+        self._created[slot] = time.time()
+        self._size += 1
+    
+    def expire(self):
+        """Drop summaries older than the TTL"""
+        cutoff = time.time() - self.ttl
+        
+        # Entries are added in time order, so expired ones are the oldest
+        expired = 0
+        while expired < self._size and self._created[(self._head + expired) % self.maxsize] < cutoff:
+            expired += 1
+        
+        if expired:
+            self._drop_oldest(expired)
+    
+    def _drop_oldest(self, count: int):
+        """Remove the `count` oldest summaries"""
+        for i in range(count):
+            self._payloads[(self._head + i) % self.maxsize] = None
+        self._head = (self._head + count) % self.maxsize
+        self._size -= count
+        self.stats['semantic_evictions'] += count
+    
+    def _live_ranges(self) -> List[Tuple[int, int]]:
+        """Row ranges of the live entries, oldest first (two once they wrap around)"""
+        end = self._head + self._size
+        if end <= self.maxsize:
+            return [(self._head, end)]
+        return [(self._head, self.maxsize), (0, end - self.maxsize)]
+    
+    def __len__(self) -> int:
+        return self._size
@@ -0,0 +1,14 @@
+"""
+Test configuration shared by every test module
+
+Settings and the database engine are read at import time, so the
+environment is set up here, before any src module is imported.
+"""
+
+import os
+import tempfile
+
+_db_dir = tempfile.mkdtemp()
+os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(_db_dir, 'test.db')}"
+for _name, _value in (('GEMINI_API_KEY', 'test'), ('TELEGRAM_BOT_TOKEN', '1:test'), ('TELEGRAM_WEBHOOK_URL', 'http://test')):
+    os.environ.setdefault(_name, _value)
@@ -0,0 +1,123 @@
+"""
+Tests for the single-statement subscriber and article writes
+"""
+
+import unittest
+from datetime import datetime, timezone
+
+from sqlalchemy import func
+
+from src.storage.database import (
+    AsyncSessionLocal, SessionLocal, Article, Subscriber, async_engine, init_db, insert_new_articles, upsert_subscriber
+)
+
+
+def article_row(url: str, title: str = 'Title') -> dict:
+    return {
+        'title': title,
+        'url': url,
+        'source_name': 'Source',
+        'source_domain': 'example.com',
+        'published_at': datetime.now(timezone.utc),
+    }
+
+
+class UpsertSubscriberTest(unittest.IsolatedAsyncioTestCase):
+    @classmethod
+    def setUpClass(cls):
+        init_db()
+    
+    def setUp(self):
+        with SessionLocal() as db:
+            db.query(Subscriber).delete()
+            db.commit()
+    
+    async def asyncTearDown(self):
+        # Each test runs on its own event loop; pooled connections can't be shared
+        await async_engine.dispose()
+    
+    async def upsert(self, chat_id: str = '42'):
+        async with AsyncSessionLocal() as db:
+            return await upsert_subscriber(db, chat_id, username='alice')
+    
+    def stop(self, chat_id: str = '42'):
+        with SessionLocal() as db:
+            subscriber = db.query(Subscriber).filter_by(chat_id=chat_id).one()
+            subscriber.is_active = False
+            subscriber.unsubscribed_at = func.now()
+            db.commit()
+    
+    async def test_first_start_is_new(self):
+        self.assertEqual(await self.upsert(), 'new')
+        
+        with SessionLocal() as db:
+            subscriber = db.query(Subscriber).filter_by(chat_id='42').one()
+        self.assertTrue(subscriber.is_active)
+        self.assertEqual(subscriber.username, 'alice')
+    
+    async def test_repeat_start_while_active_changes_nothing(self):
+        await self.upsert()
+        
+        self.assertIsNone(await self.upsert())
+    
+    async def test_start_after_stop_in_same_second_is_reactivated(self):
+        await self.upsert()
+        self.stop()
+        
+        self.assertEqual(await self.upsert(), 'reactivated')
+        
+        with SessionLocal() as db:
+            subscriber = db.query(Subscriber).filter_by(chat_id='42').one()
+        self.assertTrue(subscriber.is_active)
+        self.assertIsNone(subscriber.unsubscribed_at)
+    
+    async def test_chats_are_independent(self):
+        await self.upsert('1')
+        self.stop('1')
+        
+        self.assertEqual(await self.upsert('2'), 'new')
+        self.assertEqual(await self.upsert('1'), 'reactivated')
+
+
+
+class InsertNewArticlesTest(unittest.IsolatedAsyncioTestCase):
+    @classmethod
+    def setUpClass(cls):
+        init_db()
+    
+    def setUp(self):
+        with SessionLocal() as db:
+            db.query(Article).delete()
+            db.commit()
+    
+    async def asyncTearDown(self):
+        await async_engine.dispose()
+    
+    async def insert(self, rows):
+        async with AsyncSessionLocal() as db:
+            return await insert_new_articles(db, rows)
+    
+    async def test_returns_ids_of_inserted_rows(self):
+        inserted = await self.insert([article_row('http://a'), article_row('http://b')])
+        
+        with SessionLocal() as db:
+            stored = {a.url: a.id for a in db.query(Article)}
+        self.assertEqual(inserted, stored)
+    
+    async def test_existing_urls_are_skipped_and_left_out(self):
+        first = await self.insert([article_row('http://a', 'Original')])
+        
+        inserted = await self.insert([article_row('http://a', 'Rewritten'), article_row('http://b')])
+        
+        self.assertEqual(list(inserted), ['http://b'])
+        with SessionLocal() as db:
+            original = db.query(Article).filter_by(url='http://a').one()
+        self.assertEqual(original.id, first['http://a'])
+        self.assertEqual(original.title, 'Original')
+    
+    async def test_no_rows_is_a_no_op(self):
+        self.assertEqual(await self.insert([]), {})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,141 @@
+"""
+Tests for batching and in-flight sharing in BatchedNewsSummarizer
+"""
+
+import asyncio
+import re
+import unittest
+from types import SimpleNamespace
+
+import orjson
+
+from src.summarization.llm_summarizer import BatchedNewsSummarizer
+
+
+class FakeModel:
+    """Gemini stand-in answering batch prompts, optionally leaving some articles out"""
+    
+    def __init__(self, skip=(), error=None):
+        self.model_name = 'fake'
+        self.prompts = []
+        self.skip = set(skip)
+        self.error = error
+    
+    async def generate_content_async(self, prompt, generation_config=None):
+        self.prompts.append(prompt)
+        if self.error:
+            raise self.error
+        titles = re.findall(r"^Title: (.*)$", prompt, re.M)
+        items = [
+            {'idx': idx, 'headline': f"batch {title}", 'why_matters': 'because'}
+            for idx, title in enumerate(titles, 1) if title not in self.skip
+        ]
+        return SimpleNamespace(text=orjson.dumps(items).decode())
+
+
+class FakeSummarizer:
+    """NewsSummarizer stand-in without caches; single summaries are recorded"""
+    
+    def __init__(self, model, single_error=None):
+        self.model = model
+        self.single_error = single_error
+        self.singles = []
+        self.remembered = []
+        self.semantic_cache = SimpleNamespace(embed_many=self._no_embeddings)
+    
+    @staticmethod
+    async def _no_embeddings(texts):
+        return None
+    
+    def _exact_lookup(self, article):
+        return None, article['title']
+    
+    @staticmethod
+    def _embedding_text(article):
+        return article['title']
+    
+    def _remember(self, cache_key, vector, summary):
+        self.remembered.append(cache_key)
+    
+    async def _summarize_uncached(self, article, cache_key, vector):
+        self.singles.append(article['title'])
+        await asyncio.sleep(0)
+        if self.single_error:
+            raise self.single_error
+        return {'headline': f"single {article['title']}", 'why_matters': 'because'}
+
+
+def article(title: str) -> dict:
+    return {'title': title, 'url': f"http://example.com/{title}", 'summary': 'text'}
+
+
+class BatchedNewsSummarizerTest(unittest.IsolatedAsyncioTestCase):
+    async def summarize_all(self, batcher, articles):
+        return await asyncio.wait_for(asyncio.gather(*(batcher.summarize(a) for a in articles)), timeout=2)
+    
+    async def test_full_batch_is_sent_without_waiting(self):
+        model = FakeModel()
+        batcher = BatchedNewsSummarizer(FakeSummarizer(model), max_batch_size=3, max_queue_time=60)
+        
+        results = await self.summarize_all(batcher, [article('a'), article('b'), article('c')])
+        
+        self.assertEqual([r['headline'] for r in results], ['batch a', 'batch b', 'batch c'])
+        self.assertEqual(len(model.prompts), 1)
+        self.assertEqual(batcher.summarizer.remembered, ['a', 'b', 'c'])
+    
+    async def test_partial_batch_is_flushed_after_queue_time(self):
+        model = FakeModel()
+        batcher = BatchedNewsSummarizer(FakeSummarizer(model), max_batch_size=8, max_queue_time=0.01)
+        
+        results = await self.summarize_all(batcher, [article('a'), article('b')])
+        
+        self.assertEqual([r['headline'] for r in results], ['batch a', 'batch b'])
+        self.assertEqual(len(model.prompts), 1)
+        self.assertIsNone(batcher._flush_handle)
+    
+    async def test_articles_missing_from_response_are_summarized_alone(self):
+        model = FakeModel(skip={'b'})
+        summarizer = FakeSummarizer(model)
+        batcher = BatchedNewsSummarizer(summarizer, max_batch_size=2, max_queue_time=60)
+        
+        results = await self.summarize_all(batcher, [article('a'), article('b')])
+        
+        self.assertEqual([r['headline'] for r in results], ['batch a', 'single b'])
+        self.assertEqual(summarizer.singles, ['b'])
+    
+    async def test_failed_batch_falls_back_to_single_calls(self):
+        model = FakeModel(error=RuntimeError('quota'))
+        summarizer = FakeSummarizer(model)
+        batcher = BatchedNewsSummarizer(summarizer, max_batch_size=2, max_queue_time=60)
+        
+        results = await self.summarize_all(batcher, [article('a'), article('b')])
+        
+        self.assertEqual([r['headline'] for r in results], ['single a', 'single b'])
+    
+    async def test_concurrent_calls_for_same_article_share_one_summary(self):
+        summarizer = FakeSummarizer(FakeModel())
+        batcher = BatchedNewsSummarizer(summarizer, max_batch_size=8, max_queue_time=0.01)
+        
+        first, second = await self.summarize_all(batcher, [article('a'), article('a')])
+        
+        self.assertEqual(summarizer.singles, ['a'])
+        self.assertEqual(first, second)
+        self.assertIsNot(first, second)
+        self.assertEqual(batcher._in_flight, {})
+    
+    async def test_shared_failure_reaches_every_caller(self):
+        summarizer = FakeSummarizer(FakeModel(), single_error=ValueError('bad response'))
+        batcher = BatchedNewsSummarizer(summarizer, max_batch_size=8, max_queue_time=0.01)
+        
+        results = await asyncio.wait_for(
+            asyncio.gather(batcher.summarize(article('a')), batcher.summarize(article('a')), return_exceptions=True),
+            timeout=2
+        )
+        
+        self.assertEqual([type(r) for r in results], [ValueError, ValueError])
+        self.assertEqual(summarizer.singles, ['a'])
+        self.assertEqual(batcher._in_flight, {})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,115 @@
+"""
+Tests for the streaming feed parser, checked against feedparser
+"""
+
+import calendar
+import time
+import unittest
+from email.utils import formatdate
+
+import feedparser
+
+from src.ingestion.rss_fetcher import RSSFetcher
+
+NOW = int(time.time())
+RECENT = formatdate(NOW - 3600)
+RECENT_ISO = time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime(NOW - 3600))
+OLD = formatdate(NOW - 10 * 86400)
+CUTOFF = NOW - 86400
+
+NAMESPACED_RSS = f"""<?xml version="1.0"?>
+<rss version="2.0"
+     xmlns:media="http://search.yahoo.com/mrss/"
+     xmlns:content="http://purl.org/rss/1.0/modules/content/"
+     xmlns:dc="http://purl.org/dc/elements/1.1/">
+<channel>
+  <title>Feed</title>
+  <item>
+    <title>Real title</title>
+    <link>https://a/1</link>
+    <description>Desc</description>
+    <media:title>Image caption</media:title>
+    <media:description>img desc</media:description>
+    <media:content url="https://a/img.png"/>
+    <pubDate>{RECENT}</pubDate>
+  </item>
+  <item>
+    <title>Guid only</title>
+    <guid isPermaLink="true">https://a/2</guid>
+    <content:encoded><![CDATA[<p>Body</p>]]></content:encoded>
+    <dc:date>{RECENT_ISO}</dc:date>
+  </item>
+  <item>
+    <title>Old item</title>
+    <link>https://a/3</link>
+    <pubDate>{OLD}</pubDate>
+  </item>
+</channel>
+</rss>""".encode()
+
+ATOM = f"""<?xml version="1.0" encoding="utf-8"?>
+<feed xmlns="http://www.w3.org/2005/Atom" xmlns:media="http://search.yahoo.com/mrss/">
+  <title>Feed</title>
+  <entry>
+    <title>Atom title</title>
+    <link rel="enclosure" href="https://b/file.mp3"/>
+    <link href="https://b/1"/>
+    <summary>Atom summary</summary>
+    <media:title>Thumbnail</media:title>
+    <published>{RECENT_ISO}</published>
+    <updated>{RECENT_ISO}</updated>
+  </entry>
+</feed>""".encode()
+
+
+class FastParseTest(unittest.TestCase):
+    def assert_matches_feedparser(self, body: bytes):
+        fast = RSSFetcher._fast_parse(body, CUTOFF)
+        self.assertIsNotNone(fast)
+        
+        expected = [
+            entry for entry in feedparser.parse(body).entries
+            if calendar.timegm(entry.get('published_parsed') or entry.get('updated_parsed')) >= CUTOFF
+        ]
+        self.assertEqual(len(fast), len(expected))
+        for ours, theirs in zip(fast, expected):
+            self.assertEqual(ours['title'], theirs.get('title'))
+            self.assertEqual(ours['link'], theirs.get('link'))
+            self.assertEqual(ours['summary'], theirs.get('summary'))
+            self.assertEqual(
+                calendar.timegm(ours.get('published_parsed') or ours.get('updated_parsed')),
+                calendar.timegm(theirs.get('published_parsed') or theirs.get('updated_parsed'))
+            )
+    
+    def test_namespaced_rss_matches_feedparser(self):
+        self.assert_matches_feedparser(NAMESPACED_RSS)
+    
+    def test_atom_matches_feedparser(self):
+        self.assert_matches_feedparser(ATOM)
+    
+    def test_itunes_summary_does_not_replace_description(self):
+        body = f"""<rss xmlns:itunes="http://www.itunes.com/dtds/podcast-1.0.dtd"><channel>
+            <item><title>t</title><link>https://c/1</link><description>Desc</description>
+            <itunes:summary>podcast summary</itunes:summary><pubDate>{RECENT}</pubDate></item>
+        </channel></rss>""".encode()
+        self.assertEqual(RSSFetcher._fast_parse(body, CUTOFF)[0]['summary'], 'Desc')
+    
+    def test_keeps_new_items_after_old_ones(self):
+        body = f"""<rss><channel>
+            <item><title>old</title><link>https://c/1</link><pubDate>{OLD}</pubDate></item>
+            <item><title>new</title><link>https://c/2</link><pubDate>{RECENT}</pubDate></item>
+        </channel></rss>""".encode()
+        self.assertEqual([e['title'] for e in RSSFetcher._fast_parse(body, CUTOFF)], ['new'])
+    
+    def test_item_without_link_falls_back(self):
+        body = f"""<rss><channel>
+            <item><title>no link</title><guid isPermaLink="false">id-1</guid><pubDate>{RECENT}</pubDate></item>
+        </channel></rss>""".encode()
+        self.assertIsNone(RSSFetcher._fast_parse(body, CUTOFF))
+    
+    def test_not_a_feed(self):
+        self.assertIsNone(RSSFetcher._fast_parse(b"<html><body/></html>", CUTOFF))
+
+
+if __name__ == '__main__':
+    unittest.main()
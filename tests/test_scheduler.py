@@ -0,0 +1,183 @@
+"""
+Tests for the news pipeline's retries: failed classifications and summaries, and resends of stored, unsent summaries
+"""
+
+import asyncio
+import unittest
+from datetime import datetime, timezone
+
+from src.scheduler.tasks import MAX_SEND_ATTEMPTS, NewsAgentScheduler
+from src.storage.database import SessionLocal, Article, init_db
+
+
+class FakeFetcher:
+    def __init__(self, articles):
+        self.articles = articles
+        self.seen = set()
+        self.validators = 'pending'
+    
+    async def stream_all(self, queue: asyncio.Queue, limit=None) -> int:
+        fresh = [a for a in self.articles if a['url'] not in self.seen]
+        for article in fresh:
+            await queue.put(article)
+        return len(fresh)
+    
+    def mark_seen(self, articles):
+        self.seen.update(a['url'] for a in articles)
+    
+    def commit_validators(self):
+        if self.validators == 'pending':
+            self.validators = 'committed'
+    
+    def discard_validators(self):
+        self.validators = 'discarded'
+    
+    def save_state(self):
+        pass
+
+
+class FakeFilter:
+    def __init__(self):
+        self.failing = False
+    
+    async def is_ai_relevant_batch(self, articles):
+        return [None if self.failing else (True, 90.0, 'AI') for _ in articles]
+
+
+class FakeSummarizer:
+    def __init__(self):
+        self.calls = 0
+        self.failing = False
+    
+    async def summarize(self, article_data):
+        self.calls += 1
+        if self.failing:
+            raise RuntimeError('Gemini unavailable')
+        return {'headline': f"Headline: {article_data['title']}", 'why_matters': 'It matters.'}
+    
+    def cache_stats(self):
+        return {}
+
+
+class FakeNotifier:
+    def __init__(self):
+        self.subscribed = True
+        self.reachable = False
+        self.broadcasts = []
+    
+    async def broadcast_news(self, article_data, summary):
+        if not self.subscribed:
+            return None
+        self.broadcasts.append(summary)
+        return 1 if self.reachable else 0
+
+
+class ResendTest(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        init_db()
+        with SessionLocal() as db:
+            db.query(Article).delete()
+            db.commit()
+        
+        self.article = {
+            'title': 'New model released',
+            'url': 'https://example.com/new-model',
+            'summary': 'A lab released a new model.',
+            'published_at': datetime.now(timezone.utc),
+            'source_name': 'Example',
+            'source_url': 'https://example.com/feed',
+            'source_domain': 'example.com',
+            'credibility': 90,
+        }
+        
+        # Skip __init__, which builds the real Gemini and Telegram clients
+        self.agent = NewsAgentScheduler.__new__(NewsAgentScheduler)
+        self.agent.rss_fetcher = FakeFetcher([self.article])
+        self.agent.ai_filter = FakeFilter()
+        self.agent.summarizer = FakeSummarizer()
+        self.agent.telegram = FakeNotifier()
+        self.agent._send_attempts = {}
+    
+    def _stored_row(self) -> Article:
+        with SessionLocal() as db:
+            return db.query(Article).filter_by(url=self.article['url']).one()
+    
+    async def test_failed_broadcast_is_resent_from_stored_summary(self):
+        await self.agent.run_news_pipeline()
+        
+        row = self._stored_row()
+        self.assertEqual(row.summary, "Headline: New model released\n\nIt matters.")
+        self.assertFalse(row.notification_sent)
+        self.assertNotIn(self.article['url'], self.agent.rss_fetcher.seen)
+        # Stored, so the feed may answer 304; the resend comes from the DB
+        self.assertEqual(self.agent.rss_fetcher.validators, 'committed')
+        
+        self.agent.telegram.reachable = True
+        await self.agent.run_news_pipeline()
+        
+        self.assertEqual(self.agent.summarizer.calls, 1)
+        self.assertEqual(self.agent.telegram.broadcasts[-1],
+                         {'headline': 'Headline: New model released', 'why_matters': 'It matters.'})
+        self.assertTrue(self._stored_row().notification_sent)
+        self.assertIn(self.article['url'], self.agent.rss_fetcher.seen)
+    
+    async def test_failed_summary_is_retried(self):
+        self.agent.summarizer.failing = True
+        self.agent.telegram.reachable = True
+        await self.agent.run_news_pipeline()
+        
+        self.assertIsNone(self._stored_row().summary)
+        self.assertNotIn(self.article['url'], self.agent.rss_fetcher.seen)
+        
+        self.agent.summarizer.failing = False
+        await self.agent.run_news_pipeline()
+        
+        row = self._stored_row()
+        self.assertEqual(row.summary, "Headline: New model released\n\nIt matters.")
+        self.assertTrue(row.notification_sent)
+        self.assertIn(self.article['url'], self.agent.rss_fetcher.seen)
+    
+    async def test_sent_article_is_not_resent(self):
+        self.agent.telegram.reachable = True
+        await self.agent.run_news_pipeline()
+        self.agent.rss_fetcher.seen.clear()
+        await self.agent.run_news_pipeline()
+        
+        self.assertEqual(len(self.agent.telegram.broadcasts), 1)
+        self.assertIn(self.article['url'], self.agent.rss_fetcher.seen)
+
+    
+    async def test_broadcast_is_given_up_after_max_attempts(self):
+        for _ in range(MAX_SEND_ATTEMPTS + 2):
+            await self.agent.run_news_pipeline()
+        
+        self.assertEqual(len(self.agent.telegram.broadcasts), MAX_SEND_ATTEMPTS)
+        self.assertIn(self.article['url'], self.agent.rss_fetcher.seen)
+        self.assertEqual(self.agent._send_attempts, {})
+    
+    async def test_no_subscribers_counts_as_done(self):
+        self.agent.telegram.subscribed = False
+        await self.agent.run_news_pipeline()
+        
+        row = self._stored_row()
+        self.assertTrue(row.notification_sent)
+        self.assertIsNone(row.sent_at)
+        self.assertIn(self.article['url'], self.agent.rss_fetcher.seen)
+    
+    async def test_failed_classification_is_retried(self):
+        self.agent.ai_filter.failing = True
+        await self.agent.run_news_pipeline()
+        
+        with SessionLocal() as db:
+            self.assertEqual(db.query(Article).count(), 0)
+        self.assertNotIn(self.article['url'], self.agent.rss_fetcher.seen)
+        self.assertEqual(self.agent.rss_fetcher.validators, 'discarded')
+        
+        self.agent.ai_filter.failing = False
+        self.agent.telegram.reachable = True
+        await self.agent.run_news_pipeline()
+        self.assertTrue(self._stored_row().notification_sent)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,65 @@
+"""
+Tests for the ring buffer behind the semantic summary cache
+"""
+
+import unittest
+from unittest import mock
+
+import numpy as np
+
+from src.summarization.semantic_cache import SemanticCache
+
+
+def unit(i: int, dim: int = 8) -> np.ndarray:
+    vector = np.zeros(dim, dtype=np.float32)
+    vector[i % dim] = 1.0
+    return vector
+
+
+class SemanticCacheTest(unittest.TestCase):
+    def test_lookup_finds_similar_summary(self):
+        cache = SemanticCache(maxsize=4)
+        cache.add(unit(0), {'headline': 'a'})
+        cache.add(unit(1), {'headline': 'b'})
+        
+        self.assertEqual(cache.lookup(unit(1)), {'headline': 'b'})
+        self.assertIsNone(cache.lookup(unit(5)))
+        self.assertEqual(cache.stats['semantic_hits'], 1)
+        self.assertEqual(cache.stats['semantic_misses'], 1)
+    
+    def test_full_cache_overwrites_oldest_and_wraps(self):
+        cache = SemanticCache(maxsize=3)
+        for i in range(5):
+            cache.add(unit(i), {'headline': str(i)})
+        
+        self.assertEqual(len(cache), 3)
+        self.assertEqual(cache.stats['semantic_evictions'], 2)
+        self.assertIsNone(cache.lookup(unit(0)))
+        self.assertIsNone(cache.lookup(unit(1)))
+        # Live rows now wrap past the end of the buffer
+        self.assertEqual(
+            cache.lookup_many(np.stack([unit(2), unit(3), unit(4)])),
+            [{'headline': '2'}, {'headline': '3'}, {'headline': '4'}]
+        )
+    
+    def test_expire_drops_old_entries(self):
+        cache = SemanticCache(ttl=60, maxsize=4)
+        with mock.patch('src.summarization.semantic_cache.time.time', return_value=1000.0):
+            cache.add(unit(0), {'headline': 'old'})
+        with mock.patch('src.summarization.semantic_cache.time.time', return_value=1050.0):
+            cache.add(unit(1), {'headline': 'new'})
+        
+        with mock.patch('src.summarization.semantic_cache.time.time', return_value=1070.0):
+            self.assertIsNone(cache.lookup(unit(0)))
+            self.assertEqual(cache.lookup(unit(1)), {'headline': 'new'})
+        self.assertEqual(len(cache), 1)
+    
+    def test_returned_payload_is_a_copy(self):
+        cache = SemanticCache(maxsize=2)
+        cache.add(unit(0), {'headline': 'a'})
+        cache.lookup(unit(0))['headline'] = 'changed'
+        self.assertEqual(cache.lookup(unit(0)), {'headline': 'a'})
+
+
+if __name__ == '__main__':
+    unittest.main()
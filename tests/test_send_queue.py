@@ -0,0 +1,79 @@
+"""
+Tests for the shared Telegram send gate's flood-control handling
+"""
+
+import asyncio
+import unittest
+from datetime import timedelta
+
+from telegram.error import RetryAfter
+
+from src.notification.send_queue import TelegramSendQueue
+
+PAUSE = 0.05
+
+
+class FloodedSender:
+    """Send callable that answers 429 for its first `floods` calls"""
+    
+    def __init__(self, name: str, calls: list, floods: int = 0, retry_after=PAUSE):
+        self.name = name
+        self.calls = calls
+        self.floods = floods
+        self.retry_after = retry_after
+    
+    async def __call__(self):
+        self.calls.append((self.name, asyncio.get_running_loop().time()))
+        if self.floods:
+            self.floods -= 1
+            raise RetryAfter(self.retry_after)
+        return self.name
+
+
+class TelegramSendQueueTest(unittest.IsolatedAsyncioTestCase):
+    async def test_retry_after_pauses_every_sender(self):
+        queue = TelegramSendQueue(concurrency=5, rate_limit=100)
+        calls = []
+        start = asyncio.get_running_loop().time()
+        
+        results = await asyncio.gather(
+            queue.send(FloodedSender('flooded', calls, floods=1)),
+            queue.send(FloodedSender('other', calls))
+        )
+        
+        self.assertEqual(results, ['flooded', 'other'])
+        # The second sender only got through once the pause was over
+        other_at = next(at for name, at in calls if name == 'other')
+        self.assertGreaterEqual(other_at - start, PAUSE * 0.9)
+        self.assertEqual([name for name, _ in calls].count('flooded'), 2)
+    
+    async def test_concurrent_429s_share_one_pause(self):
+        queue = TelegramSendQueue(concurrency=5, rate_limit=100)
+        calls = []
+        start = asyncio.get_running_loop().time()
+        
+        await asyncio.gather(*(queue.send(FloodedSender(str(i), calls, floods=1)) for i in range(3)))
+        
+        # Three back-to-back pauses would take 3 * PAUSE
+        self.assertLess(asyncio.get_running_loop().time() - start, PAUSE * 2.5)
+        self.assertEqual(len(calls), 6)
+    
+    async def test_timedelta_retry_after(self):
+        queue = TelegramSendQueue(concurrency=1, rate_limit=100)
+        
+        result = await queue.send(FloodedSender('sender', [], floods=1, retry_after=timedelta(seconds=PAUSE)))
+        
+        self.assertEqual(result, 'sender')
+    
+    async def test_gives_up_after_max_retries(self):
+        queue = TelegramSendQueue(concurrency=1, rate_limit=100, max_retries=2)
+        calls = []
+        
+        with self.assertRaises(RetryAfter):
+            await queue.send(FloodedSender('sender', calls, floods=10, retry_after=0.01))
+        
+        self.assertEqual(len(calls), 3)
+
+
+if __name__ == '__main__':
+    unittest.main()